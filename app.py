@@ -4,14 +4,18 @@ Initializes and runs the Discord bot with a modular cog-based structure.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
 import os
 import discord
+from discord import app_commands
 from discord.ext import commands
 
 # Import configuration and logger from our utility files
 from config import BOT_CONFIG, ERROR_MESSAGES
 from utils.logger import setup_logger
+from utils.message_router import COMMAND, IGNORED, MessageRouter
 
 # Initialize logging
 logger = setup_logger()
@@ -26,8 +30,13 @@ class DiscordBot(commands.Bot):
         intents.members = True          # Required for member join/leave events
         intents.voice_states = True     # Required for voice state events
 
+        # Per-guild prefixes; every message is classified exactly once by the router
+        self.router = MessageRouter(BOT_CONFIG['command_prefix'], BOT_CONFIG['prefix_file'])
+        # Prefix matched during classification, handed to get_prefix() so it isn't parsed twice
+        self._matched_prefixes = {}
+
         super().__init__(
-            command_prefix=BOT_CONFIG['command_prefix'],
+            command_prefix=lambda bot, message: bot.router.prefixes_for(message.guild.id if message.guild else None),
             intents=intents,
             help_command=None  # We will use a custom help command
         )
@@ -47,22 +56,82 @@ class DiscordBot(commands.Bot):
         
         logger.info("--- All Cogs Loaded Successfully ---")
 
+        await self.sync_command_tree()
+
+    def command_tree_hash(self):
+        """Returns a stable hash of all slash command definitions."""
+        payload = [command.to_dict() for command in self.tree.get_commands()]
+        payload.sort(key=lambda command: command['name'])
+        encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    async def sync_command_tree(self):
+        """Syncs slash commands globally, but only if their definitions changed since the last sync."""
+        hash_file = BOT_CONFIG['command_hash_file']
+        current_hash = self.command_tree_hash()
+
+        stored_hash = None
+        if os.path.exists(hash_file):
+            with open(hash_file, 'r', encoding='utf-8') as f:
+                stored_hash = f.read().strip()
+
+        if stored_hash == current_hash and not BOT_CONFIG['force_command_sync']:
+            logger.info("Slash commands unchanged, skipping command tree sync.")
+            return
+
+        try:
+            synced = await self.tree.sync()
+        except discord.HTTPException as e:
+            logger.error(f"Failed to sync command tree: {e}")
+            return
+
+        with open(hash_file, 'w', encoding='utf-8') as f:
+            f.write(current_hash)
+        logger.info(f"Synced {len(synced)} slash commands.")
+
+    async def on_message(self, message: discord.Message):
+        """
+        Single entry point for all messages. Classifies the message once, then
+        runs commands and dispatches 'routed_message' to the cogs.
+        """
+        kind, prefix = self.router.classify(message, self.user)
+        if kind == IGNORED:
+            return
+
+        self.dispatch('routed_message', message, kind)
+
+        if kind == COMMAND:
+            self._matched_prefixes[message.id] = prefix
+            await self.process_commands(message)
+
+    async def get_prefix(self, message: discord.Message):
+        """Returns the prefix already matched by the router, falling back to the guild's prefixes."""
+        prefix = self._matched_prefixes.pop(message.id, None)
+        if prefix is not None:
+            return prefix
+        return await super().get_prefix(message)
+
     async def on_command_error(self, ctx: commands.Context, error: commands.CommandError):
         """Handles errors that occur in commands globally."""
         prefix = BOT_CONFIG['command_prefix']
+
+        # Errors from slash invocations of hybrid commands arrive wrapped around
+        # app_commands errors, so each branch also matches the app command equivalent
+        if isinstance(error, commands.HybridCommandError):
+            error = error.original
         
         if isinstance(error, commands.CommandNotFound):
             logger.warning(f"Unknown command attempt by {ctx.author}: {ctx.message.content}")
         elif isinstance(error, commands.MissingRequiredArgument):
             await ctx.send(ERROR_MESSAGES['missing_required_argument'].format(param_name=error.param.name))
-        elif isinstance(error, commands.CommandOnCooldown):
+        elif isinstance(error, (commands.CommandOnCooldown, app_commands.CommandOnCooldown)):
             await ctx.send(ERROR_MESSAGES['command_on_cooldown'].format(remaining=error.retry_after))
-        elif isinstance(error, commands.MissingPermissions):
+        elif isinstance(error, (commands.MissingPermissions, commands.NotOwner, app_commands.MissingPermissions)):
             await ctx.send(ERROR_MESSAGES['no_permission'])
-        elif isinstance(error, commands.BotMissingPermissions):
+        elif isinstance(error, (commands.BotMissingPermissions, app_commands.BotMissingPermissions)):
             await ctx.send(ERROR_MESSAGES['bot_missing_permissions'])
         else:
-            logger.error(f"An unexpected command error occurred: {error}", exc_info=True)
+            logger.error(f"An unexpected command error occurred: {error}", exc_info=error)
             await ctx.send(ERROR_MESSAGES['unexpected_error'])
 
 
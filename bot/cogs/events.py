@@ -1,12 +1,17 @@
 import logging
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from datetime import datetime, timedelta
 import random
 
 # Importing configuration files and our JSON handler
-from config import SERVER_CHANNELS
-from utils.json_handler import load_data, save_data
+from config import BOT_CONFIG, JOIN_BURST_CONFIG, SERVER_CHANNELS, SPAM_CONFIG, VOICE_CONFIG
+from utils.join_burst import NORMAL, BurstTracker
+from utils.json_handler import modify_data
+from utils.message_router import COMMAND, MENTION
+from utils.profiler import watch_slow_callbacks
+from utils.spam_detector import SpamDetector
+from utils.voice_tracker import VoiceSessionTable
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +20,26 @@ class EventsCog(commands.Cog):
         self.bot = bot
         # A dictionary to handle per-user cooldowns for XP
         self.xp_cooldowns = {}
+        # Sliding-window flood and duplicate detector, shared by all guilds
+        self.spam_detector = SpamDetector(SPAM_CONFIG)
+        # Join/leave rate trackers that batch announcements during bursts
+        self.join_bursts = BurstTracker(JOIN_BURST_CONFIG)
+        self.leave_bursts = BurstTracker(JOIN_BURST_CONFIG)
+        # Active voice sessions, credited in one batch by the voice ticker
+        self.voice_sessions = VoiceSessionTable()
+
+    async def cog_load(self):
+        self.flush_member_digests.start()
+        if VOICE_CONFIG['enabled']:
+            self.voice_ticker.start()
+
+    async def cog_unload(self):
+        self.flush_member_digests.cancel()
+        if self.voice_ticker.is_running():
+            self.voice_ticker.cancel()
+            # Bank whatever time has accumulated since the last tick
+            self.voice_sessions.tick(self.voice_eligibility)
+            await self.flush_voice_credits()
 
     # This helper function is also in LevelingCog, but having it here prevents
     # needing to fetch the other cog just for this calculation.
@@ -23,24 +48,38 @@ class EventsCog(commands.Cog):
         return 5 * (level ** 2) + (50 * level) + 100
 
     @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
+    @watch_slow_callbacks
+    async def on_routed_message(self, message: discord.Message, kind: str):
         """
-        This event is triggered for every message. It handles logging mentions
-        and granting XP to users.
+        Dispatched by the bot's message router for every non-bot message, already
+        classified as a command, mention or chatter. It handles spam checks,
+        logging mentions and granting XP to users.
         """
-        # --- PRE-CHECKS: Ignore messages we don't want to process ---
-        # Ignore messages from DMs, bots, or that start with the command prefix
-        if message.author.bot or not message.guild:
+        # --- PRE-CHECKS: Bots are already filtered out by the router; skip DMs ---
+        if not message.guild:
             return
 
-        # Log when the bot is mentioned (optional)
-        if self.bot.user in message.mentions:
-            logger.info(f"Bot mentioned by {message.author} in #{message.channel}: {message.content[:100]}")
+        # --- SPAM CHECK: flagged messages are handed to the moderation cog ---
+        # Commands are checked too, so command floods count towards the limits
+        if SPAM_CONFIG['enabled']:
+            verdict = self.spam_detector.check(message.guild.id, message.channel.id, message.author.id, message.content)
+            if verdict:
+                scope, reason = verdict
+                moderation = self.bot.get_cog('ModerationCog')
+                if moderation:
+                    await moderation.handle_spam(message, scope, reason)
+                # Only the spammer loses XP; a flooded channel isn't the author's fault
+                if scope == 'user':
+                    return
 
         # If the message is a command, don't grant XP for it
-        if message.content.startswith(self.bot.command_prefix):
+        if kind == COMMAND:
             return
 
+        # Log when the bot is mentioned (optional)
+        if kind == MENTION:
+            logger.info(f"Bot mentioned by {message.author} in #{message.channel}: {message.content[:100]}")
+
         # --- XP GRANTING LOGIC ---
         guild_id = str(message.guild.id)
         user_id = str(message.author.id)
@@ -54,24 +93,29 @@ class EventsCog(commands.Cog):
         
         self.xp_cooldowns[cooldown_key] = now + timedelta(seconds=60)
         
-        data = await load_data()
-        
-        data.setdefault(guild_id, {})
-        data[guild_id].setdefault(user_id, {"xp": 0, "level": 0})
-        
         xp_to_add = random.randint(15, 25)
-        data[guild_id][user_id]["xp"] += xp_to_add
-        
-        # --- LEVEL UP CHECK ---
-        current_level = data[guild_id][user_id]["level"]
-        current_xp = data[guild_id][user_id]["xp"]
-        xp_needed = self.get_xp_for_level(current_level)
-        
-        if current_xp >= xp_needed:
-            data[guild_id][user_id]["level"] += 1
-            data[guild_id][user_id]["xp"] -= xp_needed # Carry over remaining XP
-            
-            new_level = data[guild_id][user_id]["level"]
+
+        def grant_xp(data):
+            """Adds the XP and returns the new level if the user leveled up."""
+            data.setdefault(guild_id, {})
+            data[guild_id].setdefault(user_id, {"xp": 0, "level": 0})
+            data[guild_id][user_id]["xp"] += xp_to_add
+
+            # --- LEVEL UP CHECK ---
+            current_level = data[guild_id][user_id]["level"]
+            current_xp = data[guild_id][user_id]["xp"]
+            xp_needed = self.get_xp_for_level(current_level)
+
+            if current_xp >= xp_needed:
+                data[guild_id][user_id]["level"] += 1
+                data[guild_id][user_id]["xp"] -= xp_needed # Carry over remaining XP
+                return data[guild_id][user_id]["level"]
+            return None
+
+        # Read-modify-write under one lock so the voice ticker's batched updates aren't lost
+        new_level = await modify_data(grant_xp)
+
+        if new_level is not None:
             logger.info(f"LEVEL UP: {message.author} has reached level {new_level} in {message.guild.name}.")
             
             level_up_embed = discord.Embed(
@@ -80,8 +124,10 @@ class EventsCog(commands.Cog):
                 color=discord.Color.gold()
             )
             await message.channel.send(embed=level_up_embed, delete_after=10)
-        
-        await save_data(data)
+
+            rewards = self.bot.get_cog('RewardsCog')
+            if rewards:
+                await rewards.apply_member(message.author, new_level)
 
     # --- Other events remain the same ---
 
@@ -95,18 +141,166 @@ class EventsCog(commands.Cog):
         return channel
 
     @commands.Cog.listener()
+    @watch_slow_callbacks
     async def on_ready(self):
+        if VOICE_CONFIG['enabled']:
+            self.reconcile_voice_sessions()
+
         if not hasattr(self.bot, 'ready_once'):
             self.bot.ready_once = True
             logger.info(f"Bot logged in as {self.bot.user} (ID: {self.bot.user.id})")
             logger.info(f"Connected to {len(self.bot.guilds)} guilds")
-            activity = discord.Activity(type=discord.ActivityType.listening, name=f"{self.bot.command_prefix}help")
+            activity = discord.Activity(type=discord.ActivityType.listening, name=f"{BOT_CONFIG['command_prefix']}help")
             await self.bot.change_presence(activity=activity)
         else:
             logger.info("Bot reconnected.")
+            # Queued digests survive reconnects; make sure they keep getting flushed
+            if not self.flush_member_digests.is_running():
+                self.flush_member_digests.start()
+            if VOICE_CONFIG['enabled'] and not self.voice_ticker.is_running():
+                self.voice_ticker.start()
+
+    # --- Voice activity tracking ---
+
+    @staticmethod
+    def is_voice_eligible(state: discord.VoiceState, channel, member_id: int):
+        """A member earns voice XP only when unmuted, undeafened, not AFK and not alone with bots."""
+        if state is None or channel is None:
+            return False
+        if state.self_mute or state.mute or state.self_deaf or state.deaf or state.afk:
+            return False
+        return any(not m.bot and m.id != member_id for m in channel.members)
+
+    def voice_eligibility(self, guild_id: int, member_id: int):
+        """Returns XP eligibility for a tracked member, or None if they are no longer in voice."""
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(member_id) if guild else None
+        if member is None or member.voice is None or member.voice.channel is None:
+            return None
+        return self.is_voice_eligible(member.voice, member.voice.channel, member_id)
+
+    def reconcile_voice_sessions(self):
+        """Rebuilds the session table from the guilds' current voice states, e.g. after a reconnect."""
+        active = [
+            (guild.id, member.id)
+            for guild in self.bot.guilds
+            for channel in guild.voice_channels + guild.stage_channels
+            for member in channel.members
+            if not member.bot
+        ]
+        self.voice_sessions.reconcile(active)
+        logger.info(f"Reconciled voice sessions: {len(self.voice_sessions)} members in voice.")
+
+    @tasks.loop(seconds=VOICE_CONFIG['tick_interval'])
+    async def voice_ticker(self):
+        """Credits voice time and XP to every active session in one batched store update."""
+        self.voice_sessions.tick(self.voice_eligibility)
+        await self.flush_voice_credits()
+
+    @voice_ticker.before_loop
+    async def before_voice_ticker(self):
+        await self.bot.wait_until_ready()
+
+    async def flush_voice_credits(self):
+        """Writes all pending voice credits to storage with a single read/write."""
+        credits = self.voice_sessions.pop_credits()
+        if not credits:
+            return
+        xp_per_second = VOICE_CONFIG['xp_per_minute'] / 60
+
+        def apply(data):
+            level_ups = []
+            for (guild_id, member_id), (seconds, eligible_seconds) in credits.items():
+                user = data.setdefault(str(guild_id), {}).setdefault(str(member_id), {"xp": 0, "level": 0})
+                user["voice_seconds"] = user.get("voice_seconds", 0) + round(seconds)
+                user["xp"] += round(eligible_seconds * xp_per_second)
+
+                start_level = user["level"]
+                while user["xp"] >= self.get_xp_for_level(user["level"]):
+                    user["xp"] -= self.get_xp_for_level(user["level"])
+                    user["level"] += 1
+                if user["level"] > start_level:
+                    level_ups.append((guild_id, member_id, user["level"]))
+            return level_ups
+
+        rewards = self.bot.get_cog('RewardsCog')
+        for guild_id, member_id, new_level in await modify_data(apply):
+            guild = self.bot.get_guild(guild_id)
+            member = guild.get_member(member_id) if guild else None
+            logger.info(f"LEVEL UP (voice): {member or member_id} has reached level {new_level} in {guild.name if guild else guild_id}.")
+            if rewards and member:
+                await rewards.apply_member(member, new_level)
+
+    # --- Join/leave burst handling ---
+
+    @tasks.loop(seconds=JOIN_BURST_CONFIG['digest_interval'])
+    async def flush_member_digests(self):
+        """Posts one digest embed per guild for members queued during a join/leave burst."""
+        if not (self.join_bursts.is_active() or self.leave_bursts.is_active()):
+            return
+
+        joins, raids_ended = self.join_bursts.drain()
+        leaves, _ = self.leave_bursts.drain()
+
+        for guild_id, (members, total) in joins.items():
+            await self.send_member_digest(guild_id, members, total, joined=True)
+        for guild_id, (members, total) in leaves.items():
+            await self.send_member_digest(guild_id, members, total, joined=False)
+        for guild_id in raids_ended:
+            guild = self.bot.get_guild(guild_id)
+            logger.warning(f"RAID MODE ENDED in {guild.name if guild else guild_id}.")
+            await self.send_log_embed(discord.Embed(title="✅ Raid Mode Ended", description=f"Join rate in **{guild.name if guild else guild_id}** is back below the raid threshold.", color=discord.Color.green(), timestamp=datetime.utcnow()))
+
+    @flush_member_digests.before_loop
+    async def before_flush_member_digests(self):
+        await self.bot.wait_until_ready()
+
+    async def send_member_digest(self, guild_id: int, members, total: int, joined: bool):
+        """Sends a single embed listing a batch of members who joined or left."""
+        channel_id = SERVER_CHANNELS.get('welcome_channel_id' if joined else 'goodbye_channel_id')
+        channel = self.bot.get_channel(channel_id) if channel_id else None
+        if not channel:
+            return
+
+        guild = self.bot.get_guild(guild_id)
+        lines = [f"<@{member_id}> ({name})" if joined else f"**{name}**" for member_id, name in members]
+        if total > len(members):
+            lines.append(f"...and {total - len(members)} more")
+
+        if joined:
+            embed = discord.Embed(title=f"📥 {total} New Members!", description="Welcome to the server:\n" + "\n".join(lines), color=discord.Color.green(), timestamp=datetime.utcnow())
+        else:
+            embed = discord.Embed(title=f"📤 {total} Members Left", description="\n".join(lines), color=discord.Color.red(), timestamp=datetime.utcnow())
+        if guild:
+            embed.set_footer(text=f"{guild.name} • Total Members: {guild.member_count}")
+
+        try:
+            await channel.send(embed=embed)
+        except discord.HTTPException as e:
+            logger.error(f"Failed to send member digest: {e}")
+
+    async def send_log_embed(self, embed: discord.Embed):
+        """Sends an embed to the log channel, ignoring delivery failures."""
+        log_channel = await self.get_log_channel()
+        if log_channel:
+            try:
+                await log_channel.send(embed=embed)
+            except discord.HTTPException as e:
+                logger.error(f"Failed to send log message: {e}")
 
     @commands.Cog.listener()
+    @watch_slow_callbacks
     async def on_member_join(self, member: discord.Member):
+        mode, raid_started = self.join_bursts.record(member.guild.id)
+        if raid_started:
+            logger.warning(f"RAID MODE: join rate in {member.guild.name} exceeded {JOIN_BURST_CONFIG['raid_threshold']} per {JOIN_BURST_CONFIG['window']:g}s.")
+            embed = discord.Embed(title="🚨 Raid Mode Activated", description=f"More than **{JOIN_BURST_CONFIG['raid_threshold']}** members joined **{member.guild.name}** within {JOIN_BURST_CONFIG['window']:g} seconds. Welcome messages are being batched.", color=discord.Color.dark_red(), timestamp=datetime.utcnow())
+            embed.set_footer(text=f"Latest join: {member} (ID: {member.id})")
+            await self.send_log_embed(embed)
+        if mode != NORMAL:
+            self.join_bursts.queue(member.guild.id, (member.id, member.display_name))
+            return
+
         welcome_channel_id = SERVER_CHANNELS.get('welcome_channel_id')
         if not welcome_channel_id: return
         channel = self.bot.get_channel(welcome_channel_id)
@@ -117,7 +311,13 @@ class EventsCog(commands.Cog):
             await channel.send(embed=embed)
 
     @commands.Cog.listener()
+    @watch_slow_callbacks
     async def on_member_remove(self, member: discord.Member):
+        mode, _ = self.leave_bursts.record(member.guild.id)
+        if mode != NORMAL:
+            self.leave_bursts.queue(member.guild.id, (member.id, member.name))
+            return
+
         goodbye_channel_id = SERVER_CHANNELS.get('goodbye_channel_id')
         if not goodbye_channel_id: return
         channel = self.bot.get_channel(goodbye_channel_id)
@@ -128,6 +328,7 @@ class EventsCog(commands.Cog):
             await channel.send(embed=embed)
     
     @commands.Cog.listener()
+    @watch_slow_callbacks
     async def on_message_delete(self, message: discord.Message):
         if message.author.bot or not message.content: return
         log_channel = await self.get_log_channel()
@@ -138,6 +339,7 @@ class EventsCog(commands.Cog):
             await log_channel.send(embed=embed)
             
     @commands.Cog.listener()
+    @watch_slow_callbacks
     async def on_message_edit(self, before: discord.Message, after: discord.Message):
         if before.author.bot or before.content == after.content: return
         log_channel = await self.get_log_channel()
@@ -149,8 +351,18 @@ class EventsCog(commands.Cog):
             await log_channel.send(embed=embed)
 
     @commands.Cog.listener()
+    @watch_slow_callbacks
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
-        if member.bot or before.channel == after.channel: return
+        if member.bot: return
+
+        # Any state change (join, leave, switch, mute) closes the old session segment
+        if VOICE_CONFIG['enabled']:
+            if before.channel is not None:
+                self.voice_sessions.end(member.guild.id, member.id, self.is_voice_eligible(before, before.channel, member.id))
+            if after.channel is not None:
+                self.voice_sessions.start(member.guild.id, member.id)
+
+        if before.channel == after.channel: return
         log_channel = await self.get_log_channel()
         if log_channel:
             embed = None
@@ -168,6 +380,7 @@ class EventsCog(commands.Cog):
                 await log_channel.send(embed=embed)
             
     @commands.Cog.listener()
+    @watch_slow_callbacks
     async def on_command_completion(self, ctx: commands.Context):
         logger.debug(f"Command '{ctx.command}' completed successfully by {ctx.author}")
 
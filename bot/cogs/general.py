@@ -13,7 +13,7 @@ class GeneralCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.command(name='ping')
+    @commands.hybrid_command(name='ping')
     async def ping_command(self, ctx):
         """Checks the bot's latency."""
         start_time = time.time()
@@ -31,7 +31,7 @@ class GeneralCog(commands.Cog):
         await message.edit(content=None, embed=embed)
         logger.info(f"Ping command executed by {ctx.author}.")
 
-    @commands.command(name='info', aliases=['about'])
+    @commands.hybrid_command(name='info', aliases=['about'])
     async def info_command(self, ctx): 
         """Displays information about the bot."""
         embed = discord.Embed(title="🤖 Bot Information",
@@ -47,7 +47,7 @@ class GeneralCog(commands.Cog):
         # Bot status
         embed.add_field(
             name="🔧 Status",
-            value=f"Latency: {self.bot.latency*1000:.2f}ms\nPrefix: `{BOT_CONFIG['command_prefix']}`",
+            value=f"Latency: {self.bot.latency*1000:.2f}ms\nPrefix: `{ctx.prefix}`",
             inline=True)
 
         # Version info
@@ -64,6 +64,37 @@ class GeneralCog(commands.Cog):
         await ctx.send(embed=embed)
         logger.info(f"Info command executed by {ctx.author}.")
 
+    @commands.group(name='prefix', invoke_without_command=True)
+    @commands.guild_only()
+    async def prefix_command(self, ctx):
+        """Shows the command prefixes used in this server."""
+        prefixes = self.bot.router.prefixes_for(ctx.guild.id)
+        await ctx.send(f"Command prefixes for this server: {', '.join(f'`{p}`' for p in prefixes)}")
+
+    @prefix_command.command(name='set')
+    @commands.has_permissions(manage_guild=True)
+    async def prefix_set_command(self, ctx, *prefixes: str):
+        """Sets one or more command prefixes for this server."""
+        if not prefixes:
+            await ctx.send(f"❌ Please provide at least one prefix.\nExample: `{ctx.prefix}prefix set ? !!`")
+            return
+        if any(len(p) > 10 for p in prefixes):
+            await ctx.send("❌ Prefixes can be at most 10 characters long.")
+            return
+
+        self.bot.router.set_prefixes(ctx.guild.id, prefixes)
+        await ctx.send(f"✅ Command prefixes set to: {', '.join(f'`{p}`' for p in prefixes)}")
+        logger.info(f"Prefixes for {ctx.guild.name} set to {prefixes} by {ctx.author}.")
+
+    @prefix_command.command(name='reset')
+    @commands.has_permissions(manage_guild=True)
+    async def prefix_reset_command(self, ctx):
+        """Restores the default command prefix for this server."""
+        self.bot.router.set_prefixes(ctx.guild.id, [])
+        await ctx.send(f"✅ Command prefix reset to `{BOT_CONFIG['command_prefix']}`.")
+        logger.info(f"Prefixes for {ctx.guild.name} reset by {ctx.author}.")
+
+
 # The setup function required to load this cog from the main bot file
 async def setup(bot):
     await bot.add_cog(GeneralCog(bot))
\ No newline at end of file
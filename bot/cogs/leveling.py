@@ -1,9 +1,15 @@
+import asyncio
+import csv
+import heapq
+import tempfile
 import discord
+from discord import app_commands
 from discord.ext import commands
 import logging
 
 # Import our new JSON handler
 from utils.json_handler import load_data
+from utils.level_io import EXPORT_FORMATS, detect_format, import_rows, iter_import_rows, write_export
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +23,18 @@ class LevelingCog(commands.Cog):
         """Calculates the total XP needed to reach a certain level."""
         return 5 * (level ** 2) + (50 * level) + 100
 
-    @commands.command(name="rank")
+    def format_duration(self, seconds: int):
+        """Formats a number of seconds as e.g. '3h 25m'."""
+        hours, remainder = divmod(int(seconds), 3600)
+        minutes = remainder // 60
+        return f"{hours}h {minutes}m" if hours else f"{minutes}m"
+
+    @commands.hybrid_command(name="rank")
+    @commands.guild_only()
+    @app_commands.describe(member="The member to check (defaults to you)")
     async def rank(self, ctx, member: discord.Member = None):
         """Checks the rank and level of a user."""
+        await ctx.defer()
         # If no member is specified, default to the command author
         target_user = member or ctx.author
         guild_id = str(ctx.guild.id)
@@ -44,6 +59,7 @@ class LevelingCog(commands.Cog):
             
             embed.add_field(name="Level", value=f"`{level}`", inline=True)
             embed.add_field(name="XP", value=f"`{xp} / {xp_needed}`", inline=True)
+            embed.add_field(name="Voice Time", value=f"`{self.format_duration(user_data.get('voice_seconds', 0))}`", inline=True)
             embed.set_footer(text=f"Requested by {ctx.author.display_name}")
 
             # Create a simple progress bar
@@ -55,9 +71,12 @@ class LevelingCog(commands.Cog):
         else:
             await ctx.send(f"{target_user.display_name} has not earned any XP yet.")
 
-    @commands.command(name="leaderboard")
+    @commands.hybrid_command(name="leaderboard")
+    @commands.guild_only()
     async def leaderboard(self, ctx):
         """Shows the server's top 10 users, sorted correctly by level then XP."""
+        # Fetching members can take a while, so acknowledge the interaction first
+        await ctx.defer()
         guild_id = str(ctx.guild.id)
         data = await load_data()
 
@@ -107,6 +126,113 @@ class LevelingCog(commands.Cog):
 
         await ctx.send(embed=embed)
 
+    @commands.hybrid_command(name="voiceleaderboard", aliases=["vlb"])
+    @commands.guild_only()
+    async def voice_leaderboard(self, ctx):
+        """Shows the server's top 10 users by time spent in voice channels."""
+        await ctx.defer()
+        guild_id = str(ctx.guild.id)
+        data = await load_data()
+
+        top_users = heapq.nlargest(
+            10,
+            ((user_id, user_data) for user_id, user_data in data.get(guild_id, {}).items() if user_data.get('voice_seconds')),
+            key=lambda item: item[1]['voice_seconds']
+        )
+
+        embed = discord.Embed(
+            title=f"🎙️ Voice Leaderboard for {ctx.guild.name}",
+            color=discord.Color.blurple(),
+            timestamp=ctx.message.created_at
+        )
+
+        description = ""
+        for i, (user_id, user_data) in enumerate(top_users):
+            member = ctx.guild.get_member(int(user_id))
+            display_name = member.display_name if member else f"Unknown User (ID: {user_id})"
+
+            if i == 0: rank_emoji = "🥇"
+            elif i == 1: rank_emoji = "🥈"
+            elif i == 2: rank_emoji = "🥉"
+            else: rank_emoji = f"**#{i+1}**"
+
+            description += f"{rank_emoji} **{display_name}** - {self.format_duration(user_data['voice_seconds'])}\n"
+
+        embed.description = description or "No voice activity has been recorded yet."
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name="export")
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    @app_commands.describe(fmt="File format: csv or jsonl")
+    async def export_command(self, ctx, fmt: str = "csv"):
+        """Exports this server's leveling data as a CSV or JSONL file."""
+        fmt = fmt.lower()
+        if fmt not in EXPORT_FORMATS:
+            await ctx.send(f"❌ Format must be one of: {', '.join(EXPORT_FORMATS)}.")
+            return
+
+        await ctx.defer()
+        data = await load_data()
+        guild_data = data.get(str(ctx.guild.id), {})
+        if not guild_data:
+            await ctx.send("There is no XP data for this server yet.")
+            return
+
+        # Serialize in chunks to a temporary file off the event loop
+        with tempfile.TemporaryFile() as tmp:
+            count = await asyncio.to_thread(write_export, guild_data, tmp, fmt)
+            tmp.seek(0)
+            await ctx.send(
+                f"📦 Exported {count} users.",
+                file=discord.File(tmp, filename=f"levels-{ctx.guild.id}.{fmt}")
+            )
+        logger.info(f"Export command executed by {ctx.author} - {count} users as {fmt}.")
+
+    @commands.command(name="import")
+    @commands.has_permissions(administrator=True)
+    async def import_command(self, ctx, mode: str = "merge"):
+        """Imports a CSV or JSONL leaderboard dump attached to the message. Use `replace` to overwrite existing data."""
+        if not ctx.message.attachments:
+            await ctx.send("❌ Please attach a `.csv` or `.jsonl` file to import.")
+            return
+
+        attachment = ctx.message.attachments[0]
+        replace = mode.lower() == "replace"
+        status = await ctx.send(f"⏳ Importing `{attachment.filename}`...")
+
+        async def report(valid, skipped):
+            await status.edit(content=f"⏳ Importing `{attachment.filename}`... {valid} valid rows read, {skipped} skipped")
+
+        with tempfile.TemporaryFile() as tmp:
+            await attachment.save(tmp)
+            tmp.seek(0)
+            # utf-8-sig also strips the byte order mark that spreadsheet exports often start with
+            with open(tmp.fileno(), "r", encoding="utf-8-sig", newline="", closefd=False) as text:
+                rows = iter_import_rows(text, detect_format(attachment.filename))
+                try:
+                    imported, skipped, errors = await import_rows(str(ctx.guild.id), rows, replace=replace, progress=report)
+                except UnicodeDecodeError:
+                    await status.edit(content="❌ The file is not valid UTF-8 text.")
+                    return
+                except csv.Error as e:
+                    await status.edit(content=f"❌ The file could not be parsed: {e}")
+                    return
+
+        summary = f"✅ Imported {imported} users ({skipped} rows skipped)."
+        if errors:
+            summary += "\n" + "\n".join(f"• {error}" for error in errors[:5])
+        await status.edit(content=summary)
+
+        # Imported levels may change who should hold reward roles
+        rewards = self.bot.get_cog('RewardsCog')
+        if rewards and imported:
+            rewards.start_reconciliation(ctx.guild)
+
+        logger.info(f"Import command executed by {ctx.author} - {imported} imported, {skipped} skipped.")
+
 
 # The setup function required to load this cog
 async def setup(bot):
@@ -1,19 +1,126 @@
 # cogs/moderation.py
 import asyncio
+import time
+from datetime import datetime, timedelta
 import discord
 from discord.ext import commands
 import logging
 
 # Importing configuration files
-from config import COOLDOWNS, ERROR_MESSAGES, SERVER_CHANNELS 
+from config import COOLDOWNS, ERROR_MESSAGES, SERVER_CHANNELS, SPAM_CONFIG
 
 logger = logging.getLogger(__name__)
 
 class ModerationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Remembers who was recently actioned for spam so a burst only
+        # triggers one timeout/alert instead of one per message.
+        self.spam_actioned = {}
+        # channel_id -> task that lifts a temporary flood slowmode
+        self.slowmode_tasks = {}
+
+    async def cog_unload(self):
+        # Lift pending flood slowmodes now rather than leaving channels stuck in them
+        pending = self.slowmode_tasks
+        self.slowmode_tasks = {}
+        for channel_id, task in pending.items():
+            task.cancel()
+            await self.lift_flood_slowmode(channel_id)
+
+    async def handle_spam(self, message: discord.Message, scope: str, reason: str):
+        """
+        Applies the configured spam actions to a flagged message.
+        Called by EventsCog when its flood detector flags a message.
+        Channel floods are not one user's fault, so they never delete
+        messages or time anyone out; they only alert and set a slowmode.
+        """
+        actions = SPAM_CONFIG['actions']
+
+        if 'delete' in actions and scope == 'user':
+            try:
+                await message.delete()
+            except (discord.Forbidden, discord.NotFound):
+                pass
+            except discord.HTTPException as e:
+                logger.error(f"Failed to delete spam message: {e}")
+
+        # Only escalate once per user per timeout period, or once per channel per slowmode period
+        now = time.monotonic()
+        if scope == 'user':
+            key = (message.guild.id, message.author.id)
+            cooldown = SPAM_CONFIG['timeout_seconds']
+        else:
+            key = (message.guild.id, message.channel.id)
+            cooldown = SPAM_CONFIG['flood_slowmode_duration']
+        if self.spam_actioned.get(key, 0) > now:
+            return
+        if len(self.spam_actioned) > 1000:
+            self.spam_actioned = {k: v for k, v in self.spam_actioned.items() if v > now}
+        self.spam_actioned[key] = now + cooldown
+
+        if scope == 'user':
+            logger.warning(f"SPAM: {message.author} in #{message.channel} ({message.guild.name}) {reason}.")
+        else:
+            logger.warning(f"FLOOD: #{message.channel} ({message.guild.name}) {reason}.")
+
+        if 'timeout' in actions and scope == 'user':
+            try:
+                await message.author.timeout(timedelta(seconds=SPAM_CONFIG['timeout_seconds']), reason=f"Spam: {reason}")
+            except discord.Forbidden:
+                logger.warning(f"Missing permissions to time out {message.author}.")
+            except discord.HTTPException as e:
+                logger.error(f"Failed to time out {message.author}: {e}")
+
+        slowmode_applied = False
+        if scope == 'channel' and SPAM_CONFIG['flood_slowmode_seconds'] > 0:
+            slowmode_applied = await self.apply_flood_slowmode(message.channel)
+
+        if 'alert' in actions or scope == 'channel':
+            log_channel_id = SERVER_CHANNELS.get('log_channel_id')
+            log_channel = self.bot.get_channel(log_channel_id) if log_channel_id else None
+            if log_channel:
+                if scope == 'user':
+                    embed = discord.Embed(title="🚫 Spam Detected", description=f"**{message.author.mention}** in **#{message.channel.name}** {reason}.", color=discord.Color.red(), timestamp=datetime.utcnow())
+                    embed.add_field(name="Actions", value=", ".join(actions) or "none", inline=False)
+                    embed.set_footer(text=f"User ID: {message.author.id}")
+                else:
+                    embed = discord.Embed(title="🌊 Channel Flood Detected", description=f"**#{message.channel.name}**: {reason}.", color=discord.Color.orange(), timestamp=datetime.utcnow())
+                    if slowmode_applied:
+                        embed.add_field(name="Actions", value=f"slowmode {SPAM_CONFIG['flood_slowmode_seconds']}s for {SPAM_CONFIG['flood_slowmode_duration']}s", inline=False)
+                await log_channel.send(embed=embed)
+
+    async def apply_flood_slowmode(self, channel):
+        """Temporarily enables slowmode on a flooded channel. Returns True if it was applied."""
+        # Leave channels that already have a slowmode configured alone
+        if getattr(channel, 'slowmode_delay', None) != 0:
+            return False
+        try:
+            await channel.edit(slowmode_delay=SPAM_CONFIG['flood_slowmode_seconds'], reason="Channel flood detected")
+        except discord.HTTPException as e:
+            logger.warning(f"Failed to set slowmode in #{channel}: {e}")
+            return False
+
+        async def lift_later():
+            await asyncio.sleep(SPAM_CONFIG['flood_slowmode_duration'])
+            self.slowmode_tasks.pop(channel.id, None)
+            await self.lift_flood_slowmode(channel.id)
+
+        self.slowmode_tasks[channel.id] = asyncio.create_task(lift_later())
+        return True
+
+    async def lift_flood_slowmode(self, channel_id: int):
+        """Removes a flood slowmode, unless a moderator has changed the slowmode since."""
+        channel = self.bot.get_channel(channel_id)
+        if channel is None or channel.slowmode_delay != SPAM_CONFIG['flood_slowmode_seconds']:
+            return
+        try:
+            await channel.edit(slowmode_delay=0, reason="Channel flood subsided")
+        except discord.HTTPException as e:
+            logger.warning(f"Failed to lift slowmode in #{channel}: {e}")
 
-    @commands.command(name='clear', aliases=['purge'])
+    @commands.hybrid_command(name='clear', aliases=['purge'])
+    @commands.guild_only()
     @commands.has_permissions(manage_messages=True)
     @commands.cooldown(1, COOLDOWNS.get('clear', 10), commands.BucketType.user)
     async def clear_command(self, ctx, amount: int = 5):
@@ -22,20 +129,26 @@ class ModerationCog(commands.Cog):
             await ctx.send("❌ Amount must be between 1 and 100.")
             return
 
+        # Purging can take several seconds; defer privately so the
+        # "thinking" message isn't caught by the purge itself
+        await ctx.defer(ephemeral=True)
+
+        # Prefix commands also delete the command message itself
+        extra = 0 if ctx.interaction else 1
+
         try:
-            # +1 to include the command message itself
-            deleted = await ctx.channel.purge(limit=amount + 1) 
+            deleted = await ctx.channel.purge(limit=amount + extra)
 
             embed = discord.Embed(
                 title="🧹 Messages Cleared",
-                description=f"Successfully deleted {len(deleted) - 1} messages.",
+                description=f"Successfully deleted {len(deleted) - extra} messages.",
                 color=discord.Color.green())
 
             # Delete the confirmation message after 5 seconds
-            await ctx.send(embed=embed, delete_after=5.0)
+            await ctx.send(embed=embed, delete_after=5.0, ephemeral=True)
 
             logger.info(
-                f"Clear command executed by {ctx.author} - Deleted {len(deleted) - 1} messages."
+                f"Clear command executed by {ctx.author} - Deleted {len(deleted) - extra} messages."
             )
 
         except discord.Forbidden:
@@ -46,7 +159,8 @@ class ModerationCog(commands.Cog):
             logger.error(f"Clear command failed: {e}")
     
     # Command name is now in English
-    @commands.command(name="rules")
+    @commands.hybrid_command(name="rules")
+    @commands.guild_only()
     @commands.has_permissions(administrator=True)
     async def rules_command(self, ctx, *, rules_text: str = ""):
         """Posts the server rules to the designated rules channel."""
@@ -61,10 +175,13 @@ class ModerationCog(commands.Cog):
 
         if not rules_text.strip():
             await ctx.send(
-                "❌ Please provide the rules to post.\nExample: `!rules No spamming.`"
+                f"❌ Please provide the rules to post.\nExample: `{ctx.prefix}rules No spamming.`"
             )
             return
 
+        # Defer privately so the slash response survives the purge below
+        await ctx.defer(ephemeral=True)
+
         # Purge the channel first to keep it clean
         await ctx.channel.purge(limit=100)
 
@@ -79,14 +196,16 @@ class ModerationCog(commands.Cog):
 
         embed.set_footer(text=f"Last updated by {ctx.author.display_name}")
 
-        # Send the embed
-        await ctx.send(embed=embed)
+        # Send the embed straight to the channel so it is public for slash commands too
+        await ctx.channel.send(embed=embed)
 
         # Send the rules as a separate, plain text message for readability
         formatted_rules = "\n\n".join(
             [line.strip() for line in rules_text.split("\n") if line.strip()])
 
-        await ctx.send(formatted_rules)
+        await ctx.channel.send(formatted_rules)
+        if ctx.interaction:
+            await ctx.send("✅ Rules posted.", ephemeral=True)
         logger.info(f"Server rules updated by {ctx.author}.")
 
 
@@ -0,0 +1,75 @@
+import asyncio
+import io
+import logging
+import discord
+from discord.ext import commands
+
+# Importing configuration files and our profiling helpers
+from config import PROFILING_CONFIG
+from utils.profiler import LoopProfiler, StackSampler
+
+logger = logging.getLogger(__name__)
+
+class ProfilingCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Only one profile can run at a time
+        self.profile_lock = asyncio.Lock()
+
+    @commands.command(name="profile")
+    @commands.is_owner()
+    async def profile_command(self, ctx, seconds: int = 10, mode: str = "collapsed"):
+        """
+        Profiles the running bot for N seconds (owner only).
+        Modes: `collapsed` samples every thread into flamegraph-compatible stacks,
+        `stats` runs cProfile on the event loop and uploads a sorted report.
+        """
+        mode = mode.lower()
+        if mode not in ("collapsed", "stats"):
+            await ctx.send("❌ Mode must be `collapsed` or `stats`.")
+            return
+        if seconds < 1 or seconds > PROFILING_CONFIG['max_seconds']:
+            await ctx.send(f"❌ Duration must be between 1 and {PROFILING_CONFIG['max_seconds']} seconds.")
+            return
+        if self.profile_lock.locked():
+            await ctx.send("❌ A profile is already running.")
+            return
+
+        async with self.profile_lock:
+            await ctx.send(f"⏱️ Profiling for {seconds}s ({mode})...")
+            logger.info(f"Profiling started by {ctx.author} for {seconds}s ({mode}).")
+
+            if mode == "collapsed":
+                sampler = StackSampler(PROFILING_CONFIG['sample_interval'])
+                sampler.start()
+                try:
+                    await asyncio.sleep(seconds)
+                finally:
+                    await asyncio.to_thread(sampler.stop)
+                report = await asyncio.to_thread(sampler.collapsed)
+                summary = f"📊 Collected {sampler.samples} samples across {len(sampler.counts)} unique stacks."
+                filename = "profile.collapsed.txt"
+            else:
+                profiler = LoopProfiler()
+                profiler.start()
+                try:
+                    await asyncio.sleep(seconds)
+                finally:
+                    profiler.stop()
+                report = await asyncio.to_thread(profiler.report)
+                summary = "📊 Event loop profile, sorted by cumulative time."
+                filename = "profile.stats.txt"
+
+        try:
+            await ctx.send(summary, file=discord.File(io.BytesIO(report.encode("utf-8")), filename=filename))
+        except discord.HTTPException as e:
+            # Usually a 413 when the report exceeds the upload size limit
+            await ctx.send("❌ Failed to upload the profile; it may exceed the attachment size limit. Try a shorter duration.")
+            logger.error(f"Failed to upload profile: {e}")
+            return
+        logger.info(f"Profiling by {ctx.author} finished.")
+
+
+# The setup function required to load this cog
+async def setup(bot):
+    await bot.add_cog(ProfilingCog(bot))
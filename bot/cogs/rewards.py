@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import discord
+from discord.ext import commands
+
+# Importing configuration files and our storage helpers
+from config import REWARDS_CONFIG
+from utils.json_handler import load_data
+from utils.profiler import watch_slow_callbacks
+from utils.role_rewards import RewardStore, role_diff
+
+logger = logging.getLogger(__name__)
+
+class RewardsCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.store = RewardStore(REWARDS_CONFIG['rewards_file'])
+        # guild_id -> running reconciliation task
+        self.jobs = {}
+        # guild_id -> [members checked, members total, roles edited] for the running job
+        self.progress = {}
+
+    async def cog_unload(self):
+        # Cursors are already saved, so cancelled jobs resume on the next start
+        for task in self.jobs.values():
+            task.cancel()
+
+    def live_rewards(self, guild: discord.Guild):
+        """Returns the guild's rewards, skipping roles that no longer exist."""
+        return {level: role_id for level, role_id in self.store.rewards_for(guild.id).items() if guild.get_role(role_id)}
+
+    async def edit_member_roles(self, member: discord.Member, to_add, to_remove, reason: str):
+        """
+        Adds and removes only the given reward roles, leaving every other role
+        untouched even if the cached member is stale. Returns the number of
+        role edits made.
+        """
+        guild = member.guild
+        add_roles = [role for role in map(guild.get_role, to_add) if role]
+        remove_roles = [role for role in map(guild.get_role, to_remove) if role]
+        edits = 0
+        try:
+            if add_roles:
+                await member.add_roles(*add_roles, reason=reason)
+                edits += len(add_roles)
+            if remove_roles:
+                await member.remove_roles(*remove_roles, reason=reason)
+                edits += len(remove_roles)
+        except discord.Forbidden:
+            logger.warning(f"Missing permissions to edit roles of {member} in {guild.name}.")
+        except discord.HTTPException as e:
+            logger.error(f"Failed to edit roles of {member}: {e}")
+        return edits
+
+    async def apply_member(self, member: discord.Member, level: int):
+        """Gives (or takes) reward roles for a member who just reached `level`."""
+        rewards = self.live_rewards(member.guild)
+        if not rewards:
+            return
+        to_add, to_remove = role_diff((role.id for role in member.roles), level, rewards, REWARDS_CONFIG['stack'])
+        if to_add or to_remove:
+            await self.edit_member_roles(member, to_add, to_remove, reason=f"Level {level} reward")
+
+    def start_reconciliation(self, guild: discord.Guild, restart: bool = True):
+        """
+        Starts a background job that brings every member's reward roles in line
+        with their level. With restart=False an interrupted job resumes from its cursor.
+        """
+        running = self.jobs.get(guild.id)
+        if running and not running.done():
+            running.cancel()
+
+        if not self.live_rewards(guild):
+            # Nothing to hand out; drop any leftover cursor instead of walking every member
+            self.store.set_cursor(guild.id, None)
+            return
+
+        if restart or self.store.get_cursor(guild.id) is None:
+            self.store.set_cursor(guild.id, 0)
+        self.jobs[guild.id] = asyncio.create_task(self.reconcile_guild(guild))
+
+    async def reconcile_guild(self, guild: discord.Guild):
+        """Diffs desired vs. current roles for all cached members and issues only the needed edits, throttled."""
+        async def load_levels():
+            return (await load_data()).get(str(guild.id), {})
+
+        try:
+            cursor = self.store.get_cursor(guild.id) or 0
+            rewards = self.live_rewards(guild)
+            levels = await load_levels()
+            interval = 1 / REWARDS_CONFIG['edits_per_second']
+
+            # Members are walked in ID order so the cursor can mark progress
+            members = sorted((m for m in guild.members if not m.bot and m.id > cursor), key=lambda m: m.id)
+            progress = self.progress[guild.id] = [0, len(members), 0]
+            logger.info(f"Reward reconciliation started in {guild.name}: {len(members)} members to check.")
+
+            for member in members:
+                level = levels.get(str(member.id), {}).get('level', 0)
+                to_add, to_remove = role_diff((role.id for role in member.roles), level, rewards, REWARDS_CONFIG['stack'])
+                if to_add or to_remove:
+                    # The snapshot may be stale if the member levelled up since; re-check before editing
+                    levels = await load_levels()
+                    level = levels.get(str(member.id), {}).get('level', 0)
+                    to_add, to_remove = role_diff((role.id for role in member.roles), level, rewards, REWARDS_CONFIG['stack'])
+                if to_add or to_remove:
+                    edits = await self.edit_member_roles(member, to_add, to_remove, reason="Level reward reconciliation")
+                    if edits:
+                        progress[2] += 1
+                    # Stay under the role-edit rate limit (each role is its own request)
+                    await asyncio.sleep(interval * max(edits, 1))
+
+                progress[0] += 1
+                if progress[0] % REWARDS_CONFIG['checkpoint_every'] == 0:
+                    self.store.set_cursor(guild.id, member.id)
+                    levels = await load_levels()
+
+            self.store.set_cursor(guild.id, None)
+            logger.info(f"Reward reconciliation finished in {guild.name}: {progress[2]} members updated.")
+        finally:
+            if self.jobs.get(guild.id) is asyncio.current_task():
+                del self.jobs[guild.id]
+                self.progress.pop(guild.id, None)
+
+    @commands.Cog.listener()
+    @watch_slow_callbacks
+    async def on_ready(self):
+        # Resume reconciliations that were interrupted by a restart or disconnect
+        for guild_id in self.store.pending_guilds():
+            guild = self.bot.get_guild(guild_id)
+            running = self.jobs.get(guild_id)
+            if guild and not (running and not running.done()):
+                self.start_reconciliation(guild, restart=False)
+
+    @commands.group(name="rewards", invoke_without_command=True)
+    @commands.guild_only()
+    async def rewards_command(self, ctx):
+        """Lists the roles awarded at each level."""
+        rewards = self.store.rewards_for(ctx.guild.id)
+        embed = discord.Embed(title="🎁 Level Rewards", color=discord.Color.gold(), timestamp=ctx.message.created_at)
+        if rewards:
+            embed.description = "\n".join(
+                f"Level **{level}** → <@&{role_id}>" if ctx.guild.get_role(role_id)
+                else f"Level **{level}** → ⚠️ deleted role (ID: {role_id}), remove it with `{ctx.prefix}rewards remove {level}`"
+                for level, role_id in sorted(rewards.items())
+            )
+        else:
+            embed.description = f"No level rewards configured. Use `{ctx.prefix}rewards add <level> <role>`."
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+        await ctx.send(embed=embed)
+
+    @rewards_command.command(name="add")
+    @commands.has_permissions(manage_roles=True)
+    async def rewards_add_command(self, ctx, level: int, role: discord.Role):
+        """Awards a role when members reach a level."""
+        if level < 1:
+            await ctx.send("❌ Level must be at least 1.")
+            return
+        if role >= ctx.guild.me.top_role or role.managed:
+            await ctx.send("❌ I can't assign that role. Move my role above it first.")
+            return
+
+        self.store.set_reward(ctx.guild.id, level, role.id)
+        self.start_reconciliation(ctx.guild)
+        await ctx.send(f"✅ {role.mention} will be awarded at level **{level}**. Updating existing members in the background.")
+        logger.info(f"Reward {role} at level {level} added in {ctx.guild.name} by {ctx.author}.")
+
+    @rewards_command.command(name="remove")
+    @commands.has_permissions(manage_roles=True)
+    async def rewards_remove_command(self, ctx, level: int):
+        """Stops awarding a role at a level. Members who already have it keep it."""
+        if not self.store.remove_reward(ctx.guild.id, level):
+            await ctx.send(f"❌ There is no reward at level {level}.")
+            return
+
+        self.start_reconciliation(ctx.guild)
+        await ctx.send(f"✅ Removed the level **{level}** reward.")
+        logger.info(f"Reward at level {level} removed in {ctx.guild.name} by {ctx.author}.")
+
+    @rewards_command.command(name="sync")
+    @commands.has_permissions(manage_roles=True)
+    async def rewards_sync_command(self, ctx):
+        """Re-checks every member's reward roles in the background."""
+        self.start_reconciliation(ctx.guild)
+        await ctx.send("🔄 Reward role reconciliation started.")
+
+    @rewards_command.command(name="status")
+    @commands.has_permissions(manage_roles=True)
+    async def rewards_status_command(self, ctx):
+        """Shows the progress of a running reconciliation."""
+        progress = self.progress.get(ctx.guild.id)
+        if not progress:
+            await ctx.send("No reward reconciliation is running.")
+            return
+        checked, total, edited = progress
+        await ctx.send(f"🔄 Reconciliation: {checked}/{total} members checked, {edited} updated.")
+
+
+# The setup function required to load this cog
+async def setup(bot):
+    await bot.add_cog(RewardsCog(bot))
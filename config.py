@@ -12,6 +12,11 @@ load_dotenv()
 # --- BOT SETTINGS ---
 BOT_CONFIG = {
     'command_prefix': os.getenv('COMMAND_PREFIX', '!'),
+    # Per-guild prefix overrides set with the prefix command
+    'prefix_file': os.getenv('PREFIX_FILE', 'prefixes.json'),
+    # Hash of the last synced slash command tree; sync is skipped when unchanged
+    'command_hash_file': os.getenv('COMMAND_HASH_FILE', '.command_tree_hash'),
+    'force_command_sync': os.getenv('FORCE_COMMAND_SYNC', 'False').lower() == 'true',
 }
 
 # --- LOGGING SETTINGS ---
@@ -42,6 +47,63 @@ COOLDOWNS = {
     'clear': 15, # 1 use per 15 seconds
 }
 
+# --- SPAM / FLOOD DETECTION ---
+SPAM_CONFIG = {
+    'enabled': os.getenv('SPAM_DETECTION', 'True').lower() == 'true',
+    'user_max_messages': int(os.getenv('SPAM_USER_MAX_MESSAGES', 6)),
+    'user_window': float(os.getenv('SPAM_USER_WINDOW', 5)),
+    'channel_max_messages': int(os.getenv('SPAM_CHANNEL_MAX_MESSAGES', 40)),
+    'channel_window': float(os.getenv('SPAM_CHANNEL_WINDOW', 5)),
+    'duplicate_max': int(os.getenv('SPAM_DUPLICATE_MAX', 4)),
+    'duplicate_window': float(os.getenv('SPAM_DUPLICATE_WINDOW', 30)),
+    'max_tracked_keys': int(os.getenv('SPAM_MAX_TRACKED_KEYS', 10000)),
+    # Comma-separated list of actions for spamming users: delete, timeout, alert
+    'actions': [a.strip() for a in os.getenv('SPAM_ACTIONS', 'delete,timeout,alert').split(',') if a.strip()],
+    'timeout_seconds': int(os.getenv('SPAM_TIMEOUT_SECONDS', 300)),
+    # Channel floods only alert and apply a temporary slowmode (0 disables slowmode)
+    'flood_slowmode_seconds': int(os.getenv('SPAM_FLOOD_SLOWMODE_SECONDS', 5)),
+    'flood_slowmode_duration': int(os.getenv('SPAM_FLOOD_SLOWMODE_DURATION', 60)),
+}
+
+# --- JOIN/LEAVE BURST HANDLING ---
+JOIN_BURST_CONFIG = {
+    'window': float(os.getenv('JOIN_BURST_WINDOW', 10)),
+    # Joins per window before welcome messages are batched into digests
+    'digest_threshold': int(os.getenv('JOIN_DIGEST_THRESHOLD', 5)),
+    # Joins per window before raid mode is entered and the log channel alerted
+    'raid_threshold': int(os.getenv('JOIN_RAID_THRESHOLD', 20)),
+    'digest_interval': float(os.getenv('JOIN_DIGEST_INTERVAL', 5)),
+    'max_listed': int(os.getenv('JOIN_DIGEST_MAX_LISTED', 30)),
+}
+
+# --- VOICE ACTIVITY ---
+VOICE_CONFIG = {
+    'enabled': os.getenv('VOICE_TRACKING', 'True').lower() == 'true',
+    # How often (in seconds) active voice sessions are credited
+    'tick_interval': float(os.getenv('VOICE_TICK_INTERVAL', 60)),
+    'xp_per_minute': int(os.getenv('VOICE_XP_PER_MINUTE', 10)),
+}
+
+# --- LEVEL ROLE REWARDS ---
+REWARDS_CONFIG = {
+    'rewards_file': os.getenv('REWARDS_FILE', 'rewards.json'),
+    # Keep every earned reward role (True) or only the highest one (False)
+    'stack': os.getenv('REWARDS_STACK', 'True').lower() == 'true',
+    # Role edits per second during bulk reconciliation
+    'edits_per_second': float(os.getenv('REWARDS_EDITS_PER_SECOND', 1)),
+    # Members checked between saved progress checkpoints
+    'checkpoint_every': int(os.getenv('REWARDS_CHECKPOINT_EVERY', 100)),
+}
+
+# --- PROFILING ---
+PROFILING_CONFIG = {
+    # Listeners decorated with watch_slow_callbacks that hold the event loop
+    # longer than this are logged (0 disables)
+    'slow_callback_ms': float(os.getenv('SLOW_CALLBACK_MS', 100)),
+    'sample_interval': float(os.getenv('PROFILE_SAMPLE_INTERVAL', 0.005)),
+    'max_seconds': 120,
+}
+
 # --- MESSAGES ---
 ERROR_MESSAGES = {
     'no_permission': "❌ You do not have permission to use this command.",
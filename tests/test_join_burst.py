@@ -0,0 +1,45 @@
+import unittest
+
+from utils.join_burst import DIGEST, NORMAL, RAID, BurstTracker
+
+SETTINGS = {'window': 10, 'digest_threshold': 2, 'raid_threshold': 4, 'max_listed': 3}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BurstTrackerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracker = BurstTracker(SETTINGS, self.clock)
+
+    def test_escalates_from_normal_to_digest_to_raid(self):
+        results = [self.tracker.record(1) for _ in range(6)]
+        self.assertEqual([mode for mode, _ in results], [NORMAL, NORMAL, DIGEST, DIGEST, RAID, RAID])
+        self.assertEqual([started for _, started in results], [False] * 4 + [True, False])
+        self.assertEqual(self.tracker.record(2), (NORMAL, False))
+
+    def test_queue_is_bounded_but_counts_everyone(self):
+        for member in range(5):
+            self.tracker.queue(1, member)
+        digests, _ = self.tracker.drain()
+        self.assertEqual(digests, {1: ([2, 3, 4], 5)})
+        self.assertEqual(self.tracker.drain()[0], {})
+
+    def test_steps_down_once_the_rate_drops(self):
+        for _ in range(5):
+            self.tracker.record(1)
+        self.clock.now = 30
+        self.assertEqual(self.tracker.drain(), ({}, [1]))
+        self.assertTrue(self.tracker.is_active())
+        self.assertEqual(self.tracker.drain(), ({}, []))
+        self.assertFalse(self.tracker.is_active())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils import json_handler
+from utils.level_io import (
+    MAX_LEVEL, InvalidRowError, get_xp_for_level, import_rows, level_from_total_xp, parse_row, total_xp_for,
+)
+
+
+class LevelMathTests(unittest.TestCase):
+    def test_total_xp_matches_per_level_sum(self):
+        for level in range(60):
+            expected = sum(get_xp_for_level(l) for l in range(level))
+            self.assertEqual(total_xp_for(level), expected)
+            self.assertEqual(total_xp_for(level, 42), expected + 42)
+
+    def test_level_from_total_xp_round_trips(self):
+        for level in (0, 1, 2, 17, 250, MAX_LEVEL):
+            for xp in (0, 1, get_xp_for_level(level) - 1):
+                self.assertEqual(level_from_total_xp(total_xp_for(level, xp)), (level, xp))
+
+    def test_level_boundary(self):
+        self.assertEqual(level_from_total_xp(99), (0, 99))
+        self.assertEqual(level_from_total_xp(100), (1, 0))
+
+
+class ParseRowTests(unittest.TestCase):
+    def test_total_xp_column(self):
+        self.assertEqual(parse_row({"user_id": " 123 ", "total_xp": "255"}), ("123", {"xp": 0, "level": 2}))
+
+    def test_level_and_xp_columns(self):
+        self.assertEqual(parse_row({"id": "5", "lvl": "3", "exp": "10"}), ("5", {"xp": 10, "level": 3}))
+
+    def test_xp_without_level_is_lifetime_xp(self):
+        self.assertEqual(parse_row({"user": "5", "xp": "100"}), ("5", {"xp": 0, "level": 1}))
+
+    def test_voice_seconds_kept_only_when_set(self):
+        self.assertEqual(parse_row({"user_id": "5", "xp": "0", "voice_seconds": "60"})[1]["voice_seconds"], 60)
+        self.assertNotIn("voice_seconds", parse_row({"user_id": "5", "xp": "0"})[1])
+
+    def test_rejects_invalid_rows(self):
+        bad_rows = [
+            {},
+            {"user_id": "abc", "xp": "1"},
+            {"user_id": "²³", "xp": "1"},
+            {"user_id": "١٢٣", "xp": "1"},
+            {"user_id": "1", "xp": "lots"},
+            {"user_id": "1", "xp": "-5"},
+            {"user_id": "1", "xp": "inf"},
+            {"user_id": "1", "level": str(MAX_LEVEL + 1)},
+            {"user_id": "1", "total_xp": str(total_xp_for(MAX_LEVEL) + 1)},
+            {"user_id": "1", "xp": "1", "voice_seconds": "-1"},
+        ]
+        for row in bad_rows:
+            with self.subTest(row=row), self.assertRaises(InvalidRowError):
+                parse_row(row)
+
+
+class ImportRowsTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "levels.json")
+        patcher = mock.patch.object(json_handler, "_file_path", self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stored(self):
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_merge_keeps_other_users_and_reports_errors(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"1": {"9": {"xp": 5, "level": 1}}}, f)
+
+        rows = [{"user_id": "10", "total_xp": "100"}, {"user_id": "x"}]
+        imported, skipped, errors = asyncio.run(import_rows("1", rows))
+
+        self.assertEqual((imported, skipped, len(errors)), (1, 1, 1))
+        self.assertEqual(self.stored()["1"], {"9": {"xp": 5, "level": 1}, "10": {"xp": 0, "level": 1}})
+
+    def test_merge_keeps_fields_missing_from_the_import(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"1": {"9": {"xp": 5, "level": 1, "voice_seconds": 600}}}, f)
+
+        asyncio.run(import_rows("1", [{"user_id": "9", "total_xp": "255"}]))
+        self.assertEqual(self.stored()["1"]["9"], {"xp": 0, "level": 2, "voice_seconds": 600})
+
+    def test_replace_without_valid_rows_leaves_guild_untouched(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"1": {"9": {"xp": 5, "level": 1}}}, f)
+
+        self.assertEqual(asyncio.run(import_rows("1", [{"user_id": "x"}], replace=True))[:2], (0, 1))
+        self.assertEqual(self.stored()["1"], {"9": {"xp": 5, "level": 1}})
+
+    def test_progress_reported_while_parsing(self):
+        calls = []
+
+        async def progress(valid, skipped):
+            calls.append((valid, skipped))
+
+        rows = [{"user_id": str(i), "xp": "1"} for i in range(1, 6)]
+        asyncio.run(import_rows("1", rows, progress_every=2, progress=progress))
+        self.assertEqual(calls, [(1, 0), (3, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from utils.message_router import CHATTER, COMMAND, IGNORED, MENTION, MessageRouter, PrefixTrie
+
+
+class PrefixTrieTests(unittest.TestCase):
+    def test_longest_prefix_wins(self):
+        trie = PrefixTrie(["!", "!!", "bot "])
+        self.assertEqual(trie.match("!!help"), "!!")
+        self.assertEqual(trie.match("!help"), "!")
+        self.assertEqual(trie.match("bot help"), "bot ")
+
+    def test_no_match(self):
+        trie = PrefixTrie(["!", "bot "])
+        self.assertIsNone(trie.match("hello"))
+        self.assertIsNone(trie.match("bo"))
+        self.assertIsNone(trie.match(""))
+
+    def test_ignores_empty_and_duplicate_prefixes(self):
+        trie = PrefixTrie(["!", "", "!"])
+        self.assertEqual(trie.prefixes, ["!"])
+
+
+class MessageRouterTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "prefixes.json")
+        self.router = MessageRouter("!", self.path)
+        self.bot_user = SimpleNamespace(id=99)
+
+    def message(self, content, guild_id=1, bot=False, mentions=()):
+        guild = SimpleNamespace(id=guild_id) if guild_id else None
+        return SimpleNamespace(author=SimpleNamespace(bot=bot), guild=guild, content=content, raw_mentions=list(mentions))
+
+    def test_classify(self):
+        self.assertEqual(self.router.classify(self.message("!rank"), self.bot_user), (COMMAND, "!"))
+        self.assertEqual(self.router.classify(self.message("hi", mentions=[99]), self.bot_user), (MENTION, None))
+        self.assertEqual(self.router.classify(self.message("hi"), self.bot_user), (CHATTER, None))
+        self.assertEqual(self.router.classify(self.message("!rank", bot=True), self.bot_user), (IGNORED, None))
+        self.assertEqual(self.router.classify(self.message("hi", guild_id=None), self.bot_user), (IGNORED, None))
+
+    def test_guild_prefixes_persist(self):
+        self.router.set_prefixes(1, ["?", "lvl "])
+        self.assertEqual(self.router.match_prefix(1, "!rank"), None)
+        self.assertEqual(self.router.match_prefix(2, "!rank"), "!")
+
+        reloaded = MessageRouter("!", self.path)
+        self.assertEqual(reloaded.prefixes_for(1), ["?", "lvl "])
+        reloaded.set_prefixes(1, [])
+        self.assertEqual(reloaded.prefixes_for(1), ["!"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from utils.role_rewards import desired_roles, role_diff
+
+REWARDS = {5: 500, 10: 1000, 20: 2000}
+
+
+class RoleDiffTests(unittest.TestCase):
+    def test_desired_roles(self):
+        self.assertEqual(desired_roles(4, REWARDS), set())
+        self.assertEqual(desired_roles(10, REWARDS), {500, 1000})
+        self.assertEqual(desired_roles(10, REWARDS, stack=False), {1000})
+
+    def test_adds_missing_rewards(self):
+        self.assertEqual(role_diff([1], 12, REWARDS), ({500, 1000}, set()))
+
+    def test_removes_only_reward_roles(self):
+        self.assertEqual(role_diff([1, 500, 2000], 7, REWARDS), (set(), {2000}))
+
+    def test_without_stacking_keeps_highest_reward(self):
+        self.assertEqual(role_diff([500], 25, REWARDS, stack=False), ({2000}, {500}))
+
+    def test_no_changes_needed(self):
+        self.assertEqual(role_diff([500, 1000, 3], 15, REWARDS), (set(), set()))
+
+
+if __name__ == "__main__":
+    unittest.main()
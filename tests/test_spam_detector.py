@@ -0,0 +1,46 @@
+import unittest
+
+from utils.spam_detector import SlidingWindowCounter
+
+
+class SlidingWindowCounterTests(unittest.TestCase):
+    def test_counts_within_window(self):
+        counter = SlidingWindowCounter(window=10)
+        for _ in range(3):
+            counter.hit("a", 0)
+        self.assertEqual(counter.count("a", 0), 3)
+        self.assertEqual(counter.count("b", 0), 0)
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        counter = SlidingWindowCounter(window=10)
+        for _ in range(4):
+            counter.hit("a", 0)
+        # Halfway into the next window half of the previous count still overlaps
+        self.assertAlmostEqual(counter.hit("a", 15), 1 + 4 * 0.5)
+        self.assertAlmostEqual(counter.count("a", 15), 3)
+
+    def test_old_events_expire(self):
+        counter = SlidingWindowCounter(window=10)
+        counter.hit("a", 0)
+        self.assertEqual(counter.count("a", 20), 0)
+        self.assertEqual(counter.hit("a", 25), 1)
+
+    def test_evicts_least_recently_seen_key(self):
+        counter = SlidingWindowCounter(window=10, max_keys=2)
+        counter.hit("a", 0)
+        counter.hit("b", 0)
+        counter.hit("a", 1)
+        counter.hit("c", 1)
+        self.assertEqual(len(counter), 2)
+        self.assertEqual(counter.count("b", 1), 0)
+        self.assertEqual(counter.count("a", 1), 2)
+
+    def test_reset(self):
+        counter = SlidingWindowCounter(window=10)
+        counter.hit("a", 0)
+        counter.reset("a")
+        self.assertEqual(len(counter), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from utils.voice_tracker import VoiceSessionTable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class VoiceSessionTableTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.table = VoiceSessionTable(self.clock)
+
+    def test_end_credits_session_time(self):
+        self.table.start(1, 10)
+        self.clock.now = 30
+        self.table.end(1, 10, eligible=True)
+        self.assertEqual(self.table.pop_credits(), {(1, 10): [30, 30]})
+        self.assertEqual(self.table.pop_credits(), {})
+        self.assertEqual(len(self.table), 0)
+
+    def test_start_keeps_existing_session(self):
+        self.table.start(1, 10)
+        self.clock.now = 5
+        self.table.start(1, 10)
+        self.clock.now = 10
+        self.table.end(1, 10, eligible=False)
+        self.assertEqual(self.table.pop_credits(), {(1, 10): [10, 0]})
+
+    def test_tick_credits_and_drops_departed_members(self):
+        self.table.start(1, 10)
+        self.table.start(1, 11)
+        self.clock.now = 60
+        eligibility = {(1, 10): True, (1, 11): None}
+        self.table.tick(lambda guild_id, member_id: eligibility[(guild_id, member_id)])
+        self.assertEqual(self.table.pop_credits(), {(1, 10): [60, 60]})
+        self.assertEqual(len(self.table), 1)
+
+        # Only the time since the last tick is credited next time
+        self.clock.now = 90
+        self.table.end(1, 10, eligible=False)
+        self.assertEqual(self.table.pop_credits(), {(1, 10): [30, 0]})
+
+    def test_reconcile(self):
+        self.table.start(1, 10)
+        self.table.start(1, 11)
+        self.clock.now = 100
+        self.table.reconcile([(1, 11), (1, 12)])
+        self.assertEqual(set(self.table.sessions), {(1, 11), (1, 12)})
+        self.assertEqual(self.table.sessions[(1, 11)], 0)
+        self.assertEqual(self.table.sessions[(1, 12)], 100)
+        self.assertEqual(self.table.pop_credits(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
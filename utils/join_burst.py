@@ -0,0 +1,96 @@
+"""
+join_burst.py
+Join Burst Coalescing Module
+Tracks per-guild member join/leave rates and decides whether each event should
+be announced individually, batched into a periodic digest, or treated as a raid.
+"""
+
+import time
+from collections import deque
+
+from utils.spam_detector import SlidingWindowCounter
+
+# Announcement modes returned by BurstTracker.record()
+NORMAL = "normal"
+DIGEST = "digest"
+RAID = "raid"
+
+
+class BurstTracker:
+    """
+    Per-guild sliding-window rate tracker with a bounded digest queue.
+
+    Past `digest_threshold` events per window the guild switches to digest mode
+    and events are queued for `drain()`; past `raid_threshold` it enters raid
+    mode. A guild returns to normal once its rate drops and its queue is empty.
+    """
+
+    def __init__(self, settings: dict, clock=time.monotonic):
+        self.settings = settings
+        self.clock = clock
+        self.counter = SlidingWindowCounter(settings['window'], settings.get('max_tracked_guilds', 1000))
+        self.modes = {}
+        # guild_id -> [deque of queued members (bounded), number dropped from the deque]
+        self.pending = {}
+
+    def record(self, guild_id: int):
+        """
+        Records one event for the guild.
+
+        Returns:
+            tuple: (mode, raid_started) where mode is NORMAL, DIGEST or RAID and
+            raid_started is True only for the event that tipped the guild into raid mode.
+        """
+        rate = self.counter.hit(guild_id, self.clock())
+        previous = self.modes.get(guild_id, NORMAL)
+
+        if rate > self.settings['raid_threshold']:
+            mode = RAID
+        elif rate > self.settings['digest_threshold'] or previous != NORMAL:
+            # Stay batched until the queue has been drained and the rate has dropped
+            mode = previous if previous != NORMAL else DIGEST
+        else:
+            mode = NORMAL
+
+        if mode != NORMAL:
+            self.modes[guild_id] = mode
+        return mode, mode == RAID and previous != RAID
+
+    def queue(self, guild_id: int, member):
+        """Queues a member for the next digest, keeping at most `max_listed` of them."""
+        entry = self.pending.get(guild_id)
+        if entry is None:
+            entry = self.pending[guild_id] = [deque(maxlen=self.settings['max_listed']), 0]
+        if len(entry[0]) == entry[0].maxlen:
+            entry[1] += 1
+        entry[0].append(member)
+
+    def drain(self):
+        """
+        Empties all digest queues and updates modes.
+
+        Returns:
+            tuple: (digests, raids_ended) where digests maps guild_id to
+            (members, total_count) and raids_ended lists guilds leaving raid mode.
+        """
+        digests = {}
+        for guild_id, (members, dropped) in self.pending.items():
+            if members:
+                digests[guild_id] = (list(members), len(members) + dropped)
+        self.pending.clear()
+
+        raids_ended = []
+        now = self.clock()
+        for guild_id, mode in list(self.modes.items()):
+            rate = self.counter.count(guild_id, now)
+            if mode == RAID and rate <= self.settings['raid_threshold']:
+                # Step down to digest first so the tail of the raid is still batched
+                self.modes[guild_id] = DIGEST
+                raids_ended.append(guild_id)
+            elif mode == DIGEST and rate <= self.settings['digest_threshold'] and guild_id not in digests:
+                del self.modes[guild_id]
+        return digests, raids_ended
+
+    def is_active(self):
+        """Returns True while any guild is batched or has queued members."""
+        return bool(self.modes or self.pending)
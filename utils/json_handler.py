@@ -7,6 +7,23 @@ import asyncio
 _lock = asyncio.Lock()
 _file_path = "levels.json"
 
+def _read_file():
+    """Reads the JSON file, treating a missing or corrupted file as empty."""
+    if not os.path.exists(_file_path):
+        return {}
+    with open(_file_path, 'r', encoding='utf-8') as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+
+def _write_file(data):
+    with open(_file_path, 'w', encoding='utf-8') as f:
+        # indent=4 makes the JSON file human-readable
+        json.dump(data, f, indent=4)
+
+# The file I/O itself runs in a worker thread so large files don't block the event loop
+
 async def load_data():
     """
     Asynchronously loads data from the JSON file.
@@ -15,23 +32,41 @@ async def load_data():
     async with _lock:
         # Create the file if it doesn't exist
         if not os.path.exists(_file_path):
-            with open(_file_path, 'w') as f:
-                json.dump({}, f)
+            await asyncio.to_thread(_write_file, {})
             return {}
-        
-        # Read the data from the file
-        with open(_file_path, 'r', encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                # If the file is corrupted or empty, return an empty dict
-                return {}
+        return await asyncio.to_thread(_read_file)
 
 async def save_data(data):
     """
     Asynchronously saves the provided data to the JSON file.
     """
     async with _lock:
-        with open(_file_path, 'w', encoding='utf-8') as f:
-            # indent=4 makes the JSON file human-readable
-            json.dump(data, f, indent=4)
+        await asyncio.to_thread(_write_file, data)
+
+async def modify_data(mutator):
+    """
+    Loads the data, applies `mutator(data)` and saves it, all under one lock
+    acquisition so batched updates can't interleave with other writers.
+    Returns whatever the mutator returns.
+    """
+    async with _lock:
+        data = await asyncio.to_thread(_read_file)
+        result = mutator(data)
+        await asyncio.to_thread(_write_file, data)
+        return result
+
+async def update_guild(guild_id, records, replace=False):
+    """
+    Merges a batch of user records into one guild with a single read/write.
+    Records are merged per user, so fields missing from a record (such as
+    voice_seconds) keep their stored values. If replace is True, the guild's
+    existing records are discarded first.
+    """
+    def merge(data):
+        if replace:
+            data[guild_id] = {}
+        guild = data.setdefault(guild_id, {})
+        for user_id, record in records.items():
+            guild.setdefault(user_id, {}).update(record)
+
+    await modify_data(merge)
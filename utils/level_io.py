@@ -0,0 +1,268 @@
+"""
+level_io.py
+Leveling Data Import/Export Module
+Streams a guild's leveling data out as CSV or JSONL and bulk-imports
+leaderboard dumps (e.g. from other leveling bots) through the JSON storage layer.
+
+Can also be used from the command line:
+    python -m utils.level_io export <guild_id> [--format csv|jsonl] [-o FILE]
+    python -m utils.level_io import <guild_id> <FILE> [--replace]
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+
+from utils.json_handler import load_data, update_guild
+
+EXPORT_FIELDS = ("user_id", "level", "xp", "total_xp", "voice_seconds")
+EXPORT_FORMATS = ("csv", "jsonl")
+
+# Column names accepted for each value when importing
+USER_ID_KEYS = ("user_id", "id", "userId", "user")
+TOTAL_XP_KEYS = ("total_xp", "totalXp", "total_exp")
+XP_KEYS = ("xp", "exp", "experience")
+LEVEL_KEYS = ("level", "lvl")
+VOICE_KEYS = ("voice_seconds",)
+
+# Rows beyond these are rejected as corrupt rather than imported
+MAX_LEVEL = 10000
+MAX_VOICE_SECONDS = 10 ** 10
+
+
+class InvalidRowError(ValueError):
+    """Raised for a row that cannot be imported."""
+
+
+def get_xp_for_level(level: int):
+    """Calculates the XP needed to go from `level` to the next level."""
+    return 5 * (level ** 2) + (50 * level) + 100
+
+
+def total_xp_for(level: int, xp: int = 0):
+    """Converts a (level, xp-into-level) pair into lifetime XP."""
+    # Closed form of sum(get_xp_for_level(l) for l in range(level))
+    n = level
+    return 5 * (n - 1) * n * (2 * n - 1) // 6 + 25 * (n - 1) * n + 100 * n + xp
+
+
+def level_from_total_xp(total_xp: int):
+    """Converts lifetime XP into a (level, xp-into-level) pair."""
+    # Binary search for the highest level whose cumulative cost fits
+    low, high = 0, 1
+    while total_xp_for(high) <= total_xp:
+        high *= 2
+    while high - low > 1:
+        mid = (low + high) // 2
+        if total_xp_for(mid) <= total_xp:
+            low = mid
+        else:
+            high = mid
+    return low, total_xp - total_xp_for(low)
+
+
+def iter_export_chunks(guild_data: dict, fmt: str = "csv", chunk_size: int = 1000):
+    """
+    Yields the guild's data serialized as `fmt`, `chunk_size` users at a time,
+    so callers can write it out without building the whole document in memory.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(EXPORT_FIELDS)
+
+    for count, (user_id, user_data) in enumerate(guild_data.items(), start=1):
+        level, xp = user_data.get("level", 0), user_data.get("xp", 0)
+        row = (user_id, level, xp, total_xp_for(level, xp), int(user_data.get("voice_seconds", 0)))
+        if writer:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n")
+
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def write_export(guild_data: dict, fileobj, fmt: str = "csv"):
+    """Writes the export to a binary file object chunk by chunk. Returns the row count."""
+    for chunk in iter_export_chunks(guild_data, fmt):
+        fileobj.write(chunk.encode("utf-8"))
+    return len(guild_data)
+
+
+def _pick(row: dict, keys):
+    for key in keys:
+        value = row.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def parse_row(row: dict):
+    """
+    Validates one imported row and returns (user_id, {"xp", "level"[, "voice_seconds"]}).
+    Levels are always recomputed from lifetime XP so dumps from bots with
+    inconsistent level fields still end up correct.
+    """
+    user_id = _pick(row, USER_ID_KEYS)
+    user_id = str(user_id).strip() if user_id is not None else ""
+    # isdigit() alone also accepts non-ASCII digits such as "²" or "٣"
+    if not (user_id.isascii() and user_id.isdigit()):
+        raise InvalidRowError(f"invalid user id: {user_id!r}")
+
+    try:
+        total = _pick(row, TOTAL_XP_KEYS)
+        if total is not None:
+            total = int(float(total))
+        else:
+            xp = int(float(_pick(row, XP_KEYS) or 0))
+            level = _pick(row, LEVEL_KEYS)
+            if level is not None:
+                level = int(float(level))
+                if not 0 <= level <= MAX_LEVEL:
+                    raise InvalidRowError(f"level out of range for user {user_id}")
+            # Without a level column, the xp column is assumed to be lifetime XP
+            total = total_xp_for(level, xp) if level is not None else xp
+        voice_seconds = int(float(_pick(row, VOICE_KEYS) or 0))
+    except InvalidRowError:
+        raise
+    except (TypeError, ValueError, OverflowError):
+        raise InvalidRowError(f"invalid xp/level for user {user_id}")
+
+    if total < 0 or voice_seconds < 0:
+        raise InvalidRowError(f"negative xp or voice time for user {user_id}")
+    if total > total_xp_for(MAX_LEVEL) or voice_seconds > MAX_VOICE_SECONDS:
+        raise InvalidRowError(f"xp or voice time out of range for user {user_id}")
+
+    level, xp = level_from_total_xp(total)
+    record = {"xp": xp, "level": level}
+    if voice_seconds:
+        record["voice_seconds"] = voice_seconds
+    return user_id, record
+
+
+def iter_import_rows(fileobj, fmt: str):
+    """Yields raw row dicts from a text file object in CSV or JSONL format."""
+    if fmt == "csv":
+        yield from csv.DictReader(fileobj)
+    elif fmt == "jsonl":
+        for line in fileobj:
+            line = line.strip()
+            if line:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    row = None
+                yield row if isinstance(row, dict) else {}
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+
+def detect_format(filename: str):
+    """Guesses the import format from a file name."""
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+async def import_rows(guild_id: str, rows, replace: bool = False, progress_every: int = 20000, progress=None):
+    """
+    Validates all rows first, then writes them to storage in a single call.
+
+    Nothing is written until the whole input has been parsed, so a malformed
+    file can't leave the guild half-imported, and a file with no valid rows
+    leaves the guild untouched.
+
+    Args:
+        guild_id (str): Guild to import into.
+        rows: Iterable of raw row dicts.
+        replace (bool): Wipe the guild's existing data before importing.
+        progress_every (int): Number of rows read between progress reports.
+        progress (callable, optional): Awaitable called as progress(valid, skipped)
+            while the rows are being parsed.
+
+    Returns:
+        tuple: (imported, skipped, errors) where errors holds the first few messages.
+    """
+    skipped, errors = 0, []
+    records = {}
+
+    for count, row in enumerate(rows, start=1):
+        if count % 1000 == 0:
+            # Let the event loop breathe during very large imports
+            await asyncio.sleep(0)
+        if progress and count % progress_every == 0:
+            await progress(len(records), skipped)
+        try:
+            user_id, record = parse_row(row)
+        except InvalidRowError as e:
+            skipped += 1
+            if len(errors) < 10:
+                errors.append(str(e))
+            continue
+        records[user_id] = record
+
+    if records:
+        await update_guild(guild_id, records, replace=replace)
+    return len(records), skipped, errors
+
+
+async def _cli(args):
+    guild_id = str(args.guild_id)
+    if args.command == "export":
+        data = await load_data()
+        guild_data = data.get(guild_id, {})
+        if args.output:
+            with open(args.output, "wb") as f:
+                count = write_export(guild_data, f, args.format)
+        else:
+            count = write_export(guild_data, sys.stdout.buffer, args.format)
+        print(f"Exported {count} users.", file=sys.stderr)
+    else:
+        if not os.path.exists(args.file):
+            print(f"File not found: {args.file}", file=sys.stderr)
+            return 1
+
+        async def report(valid, skipped):
+            print(f"... {valid} valid, {skipped} skipped", file=sys.stderr)
+
+        # utf-8-sig also strips the byte order mark that spreadsheet exports often start with
+        with open(args.file, "r", encoding="utf-8-sig", newline="") as f:
+            rows = iter_import_rows(f, args.format or detect_format(args.file))
+            imported, skipped, errors = await import_rows(guild_id, rows, replace=args.replace, progress=report)
+        for error in errors:
+            print(f"Skipped: {error}", file=sys.stderr)
+        print(f"Imported {imported} users ({skipped} rows skipped).", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import leveling data.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = sub.add_parser("export", help="Export a guild's leveling data")
+    export_parser.add_argument("guild_id", type=int)
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    export_parser.add_argument("-o", "--output", help="Output file (defaults to stdout)")
+
+    import_parser = sub.add_parser("import", help="Import a leaderboard dump into a guild")
+    import_parser.add_argument("guild_id", type=int)
+    import_parser.add_argument("file")
+    import_parser.add_argument("--format", choices=EXPORT_FORMATS, help="Defaults to the file extension")
+    import_parser.add_argument("--replace", action="store_true", help="Replace the guild's existing data")
+
+    return asyncio.run(_cli(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
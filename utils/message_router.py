@@ -0,0 +1,131 @@
+"""
+message_router.py
+Message Routing Module
+Classifies every incoming message exactly once as a command, a bot mention,
+or plain chatter, using per-guild command prefixes stored in small tries.
+"""
+
+import json
+import os
+
+# Message kinds produced by MessageRouter.classify()
+IGNORED = "ignored"
+COMMAND = "command"
+MENTION = "mention"
+CHATTER = "chatter"
+
+_END = object()  # Marks the end of a prefix inside a trie node
+
+
+class PrefixTrie:
+    """A tiny character trie that finds the longest prefix a string starts with."""
+
+    __slots__ = ("root", "first_chars", "prefixes")
+
+    def __init__(self, prefixes=()):
+        self.root = {}
+        # First characters of every prefix, for an O(1) reject of normal chatter
+        self.first_chars = set()
+        self.prefixes = []
+        for prefix in prefixes:
+            self.insert(prefix)
+
+    def insert(self, prefix: str):
+        """Adds a prefix to the trie."""
+        if not prefix or prefix in self.prefixes:
+            return
+        node = self.root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[_END] = prefix
+        self.first_chars.add(prefix[0])
+        self.prefixes.append(prefix)
+
+    def match(self, content: str):
+        """Returns the longest prefix that `content` starts with, or None."""
+        if not content or content[0] not in self.first_chars:
+            return None
+        node = self.root
+        found = None
+        for char in content:
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(_END, found)
+        return found
+
+
+class MessageRouter:
+    """
+    Holds the default and per-guild command prefixes and classifies messages.
+
+    Per-guild prefixes are persisted to a small JSON file so they survive restarts.
+    """
+
+    def __init__(self, default_prefix: str, file_path: str = "prefixes.json"):
+        self.default_prefix = default_prefix
+        self.file_path = file_path
+        self._default_trie = PrefixTrie([default_prefix])
+        self._guild_tries = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            try:
+                stored = json.load(f)
+            except json.JSONDecodeError:
+                return
+        for guild_id, prefixes in stored.items():
+            if prefixes:
+                self._guild_tries[int(guild_id)] = PrefixTrie(prefixes)
+
+    def _save(self):
+        stored = {str(guild_id): trie.prefixes for guild_id, trie in self._guild_tries.items()}
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=4)
+
+    def _trie_for(self, guild_id):
+        return self._guild_tries.get(guild_id, self._default_trie) if guild_id else self._default_trie
+
+    def prefixes_for(self, guild_id):
+        """Returns the list of command prefixes active in a guild."""
+        return list(self._trie_for(guild_id).prefixes)
+
+    def set_prefixes(self, guild_id: int, prefixes):
+        """Replaces a guild's prefixes. An empty list restores the default prefix."""
+        prefixes = [p for p in prefixes if p]
+        if prefixes:
+            self._guild_tries[guild_id] = PrefixTrie(prefixes)
+        else:
+            self._guild_tries.pop(guild_id, None)
+        self._save()
+
+    def match_prefix(self, guild_id, content: str):
+        """Returns the command prefix `content` starts with in the guild, or None."""
+        return self._trie_for(guild_id).match(content)
+
+    def classify(self, message, bot_user):
+        """
+        Classifies a message in a single pass.
+
+        Returns:
+            tuple: (kind, prefix) where kind is one of IGNORED, COMMAND, MENTION
+            or CHATTER, and prefix is the matched command prefix for COMMAND.
+        """
+        if message.author.bot:
+            return IGNORED, None
+
+        guild_id = message.guild.id if message.guild else None
+        prefix = self._trie_for(guild_id).match(message.content)
+        if prefix is not None:
+            return COMMAND, prefix
+
+        # Commands still work in DMs, but nothing else is processed there
+        if guild_id is None:
+            return IGNORED, None
+
+        if bot_user is not None and bot_user.id in message.raw_mentions:
+            return MENTION, None
+        return CHATTER, None
@@ -0,0 +1,151 @@
+"""
+profiler.py
+Runtime Profiling Utilities Module
+Provides a low-overhead sampling profiler for all threads of the running
+process, a cProfile helper for the event loop thread, and a listener decorator
+that reports coroutines holding the event loop for too long.
+"""
+
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from config import PROFILING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(code):
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """
+    Background thread that periodically samples the stack of every other
+    thread (the event loop and executor threads alike) and counts identical
+    stacks, producing flamegraph-compatible "collapsed" output.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_ident = threading.get_ident()
+        thread_names = {}
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            if len(thread_names) != len(frames):
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(thread_names.get(ident, f"thread-{ident}"))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        """Stops sampling and waits for the thread to exit."""
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self):
+        """Returns the samples in collapsed-stack format, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+class LoopProfiler:
+    """cProfile wrapper for code running on the event loop thread between start() and stop()."""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def report(self, sort_by: str = "cumulative", limit: int = 100):
+        """Returns the pstats report sorted by `sort_by` as text."""
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats(sort_by).print_stats(limit)
+        return stream.getvalue()
+
+
+class SlowStepTimer:
+    """
+    Awaitable wrapper that times each step of a coroutine, i.e. each stretch
+    where it holds the event loop between two suspensions, and logs steps that
+    exceed `threshold` seconds.
+    """
+
+    __slots__ = ("coro", "label", "threshold")
+
+    def __init__(self, coro, label: str, threshold: float):
+        self.coro = coro
+        self.label = label
+        self.threshold = threshold
+
+    def _check(self, started: float):
+        elapsed = time.perf_counter() - started
+        if elapsed > self.threshold:
+            logger.warning(f"SLOW CALLBACK: {self.label} held the event loop for {elapsed * 1000:.1f}ms.")
+
+    def __await__(self):
+        coro = self.coro
+        send_value, error = None, None
+        while True:
+            started = time.perf_counter()
+            try:
+                if error is not None:
+                    yielded = coro.throw(error)
+                else:
+                    yielded = coro.send(send_value)
+            except StopIteration as stop:
+                self._check(started)
+                return stop.value
+            except BaseException:
+                self._check(started)
+                raise
+            self._check(started)
+
+            try:
+                send_value, error = (yield yielded), None
+            except BaseException as e:
+                send_value, error = None, e
+
+
+def watch_slow_callbacks(func):
+    """
+    Decorator for cog listeners: every call is run under a SlowStepTimer using
+    PROFILING_CONFIG['slow_callback_ms'] as the threshold (0 disables it).
+    Apply it below `@commands.Cog.listener()` so the cog registers the wrapped
+    method itself and loading/unloading the cog keeps working as usual.
+    """
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        threshold = PROFILING_CONFIG['slow_callback_ms'] / 1000
+        if threshold <= 0:
+            return await func(self, *args, **kwargs)
+        label = f"{type(self).__name__}.{func.__name__}"
+        return await SlowStepTimer(func(self, *args, **kwargs), label, threshold)
+
+    return wrapper
@@ -0,0 +1,108 @@
+"""
+role_rewards.py
+Level Role Rewards Module
+Stores per-guild level -> role reward tables and reconciliation progress, and
+computes which role edits a member needs for their level.
+"""
+
+import json
+import os
+
+
+class RewardStore:
+    """
+    Per-guild reward configuration persisted to a small JSON file.
+
+    Layout: {guild_id: {"rewards": {level: role_id}, "cursor": member_id or null}}
+    The cursor records how far a bulk reconciliation got, so it can resume
+    after a restart.
+    """
+
+    def __init__(self, file_path: str = "rewards.json"):
+        self.file_path = file_path
+        self._guilds = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            try:
+                stored = json.load(f)
+            except json.JSONDecodeError:
+                return
+        for guild_id, entry in stored.items():
+            self._guilds[int(guild_id)] = {
+                "rewards": {int(level): int(role_id) for level, role_id in entry.get("rewards", {}).items()},
+                "cursor": entry.get("cursor"),
+            }
+
+    def _save(self):
+        stored = {
+            str(guild_id): {
+                "rewards": {str(level): role_id for level, role_id in sorted(entry["rewards"].items())},
+                "cursor": entry["cursor"],
+            }
+            for guild_id, entry in self._guilds.items()
+        }
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=4)
+
+    def _entry(self, guild_id: int):
+        return self._guilds.setdefault(guild_id, {"rewards": {}, "cursor": None})
+
+    def rewards_for(self, guild_id: int):
+        """Returns the guild's {level: role_id} reward table."""
+        entry = self._guilds.get(guild_id)
+        return dict(entry["rewards"]) if entry else {}
+
+    def set_reward(self, guild_id: int, level: int, role_id: int):
+        self._entry(guild_id)["rewards"][level] = role_id
+        self._save()
+
+    def remove_reward(self, guild_id: int, level: int):
+        """Removes a reward. Returns False if there was none at that level."""
+        removed = self._entry(guild_id)["rewards"].pop(level, None) is not None
+        if removed:
+            self._save()
+        return removed
+
+    def get_cursor(self, guild_id: int):
+        entry = self._guilds.get(guild_id)
+        return entry["cursor"] if entry else None
+
+    def set_cursor(self, guild_id: int, cursor):
+        """Stores reconciliation progress (None when no job is pending)."""
+        self._entry(guild_id)["cursor"] = cursor
+        self._save()
+
+    def pending_guilds(self):
+        """Guild IDs with an unfinished reconciliation."""
+        return [guild_id for guild_id, entry in self._guilds.items() if entry["cursor"] is not None]
+
+
+def desired_roles(level: int, rewards: dict, stack: bool = True):
+    """
+    Returns the set of reward role IDs a member at `level` should have.
+    With stack=False only the highest earned reward is kept.
+    """
+    earned = [(reward_level, role_id) for reward_level, role_id in rewards.items() if level >= reward_level]
+    if not earned:
+        return set()
+    if stack:
+        return {role_id for _, role_id in earned}
+    return {max(earned)[1]}
+
+
+def role_diff(current_role_ids, level: int, rewards: dict, stack: bool = True):
+    """
+    Compares a member's current roles against their rewards.
+
+    Returns:
+        tuple: (to_add, to_remove) sets of role IDs. Only reward roles are ever
+        removed; roles the bot doesn't manage are left alone.
+    """
+    current = set(current_role_ids)
+    managed = set(rewards.values())
+    wanted = desired_roles(level, rewards, stack)
+    return wanted - current, (current & managed) - wanted
@@ -0,0 +1,188 @@
+"""
+spam_detector.py
+Flood and Spam Detection Module
+Provides constant-time sliding-window rate tracking and duplicate-content
+detection for incoming messages.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+
+
+class SlidingWindowCounter:
+    """
+    Approximate sliding-window counter for many keys.
+
+    Each key only stores the counts of the current and previous fixed windows,
+    and the sliding estimate is the current count plus the previous count
+    weighted by how much of it still overlaps the window. Updates are O(1) and
+    the number of tracked keys is capped, evicting the least recently seen key.
+    """
+
+    __slots__ = ("window", "max_keys", "_entries")
+
+    def __init__(self, window: float, max_keys: int = 10000):
+        self.window = float(window)
+        self.max_keys = max_keys
+        # key -> [window_start, current_count, previous_count]
+        self._entries = OrderedDict()
+
+    def hit(self, key, now: float) -> float:
+        """Records one event for the key and returns the estimated count in the window."""
+        entry = self._entries.get(key)
+        if entry is None:
+            if len(self._entries) >= self.max_keys:
+                self._entries.popitem(last=False)
+            entry = [now, 0, 0]
+            self._entries[key] = entry
+        else:
+            self._entries.move_to_end(key)
+            elapsed = now - entry[0]
+            if elapsed >= self.window:
+                # Roll forward: keep the last window only if it is adjacent
+                entry[2] = entry[1] if elapsed < 2 * self.window else 0
+                entry[1] = 0
+                entry[0] += self.window * int(elapsed // self.window)
+
+        entry[1] += 1
+        overlap = 1.0 - (now - entry[0]) / self.window
+        return entry[1] + entry[2] * overlap
+
+    def count(self, key, now: float) -> float:
+        """Returns the estimated count in the window without recording an event."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0.0
+        elapsed = now - entry[0]
+        if elapsed >= 2 * self.window:
+            return 0.0
+        if elapsed >= self.window:
+            # The current window has become the previous one
+            return entry[1] * (1.0 - (elapsed - self.window) / self.window)
+        return entry[1] + entry[2] * (1.0 - elapsed / self.window)
+
+    def reset(self, key):
+        """Forgets all events recorded for the key."""
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DuplicateTracker:
+    """
+    Counts consecutive identical messages per key within a time window.
+
+    Only a short digest of the last message is kept per key, so memory stays
+    bounded regardless of message length.
+    """
+
+    __slots__ = ("window", "max_keys", "_entries")
+
+    def __init__(self, window: float, max_keys: int = 10000):
+        self.window = float(window)
+        self.max_keys = max_keys
+        # key -> [digest, repeat_count, last_seen]
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def digest(content: str) -> bytes:
+        """Hashes normalized message content (case and whitespace insensitive)."""
+        normalized = " ".join(content.lower().split())
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+
+    def hit(self, key, content: str, now: float) -> int:
+        """Records the content for the key and returns how many times in a row it was seen."""
+        digest = self.digest(content)
+        entry = self._entries.get(key)
+        if entry is None:
+            if len(self._entries) >= self.max_keys:
+                self._entries.popitem(last=False)
+            self._entries[key] = [digest, 1, now]
+            return 1
+
+        self._entries.move_to_end(key)
+        if entry[0] == digest and now - entry[2] <= self.window:
+            entry[1] += 1
+        else:
+            entry[0] = digest
+            entry[1] = 1
+        entry[2] = now
+        return entry[1]
+
+    def reset(self, key):
+        """Forgets the tracked content for the key."""
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SpamDetector:
+    """
+    Combines per-user and per-channel rate limits with duplicate detection.
+
+    `check()` returns None for normal messages, or a `(scope, reason)` tuple
+    when a message should be treated as spam. The scope is 'user' when the
+    author is at fault and 'channel' when the channel as a whole is flooded.
+    """
+
+    def __init__(self, settings: dict, clock=time.monotonic):
+        self.settings = settings
+        self.clock = clock
+        max_keys = settings.get('max_tracked_keys', 10000)
+        self.user_counter = SlidingWindowCounter(settings['user_window'], max_keys)
+        self.channel_counter = SlidingWindowCounter(settings['channel_window'], max_keys)
+        self.duplicates = DuplicateTracker(settings['duplicate_window'], max_keys)
+
+    def check(self, guild_id: int, channel_id: int, user_id: int, content: str):
+        """Records a message and returns (scope, reason), or None if the message is fine."""
+        now = self.clock()
+        user_key = (guild_id, user_id)
+
+        user_rate = self.user_counter.hit(user_key, now)
+        channel_rate = self.channel_counter.hit(channel_id, now)
+        repeats = self.duplicates.hit(user_key, content, now) if content else 0
+
+        if user_rate > self.settings['user_max_messages']:
+            return 'user', f"sent more than {self.settings['user_max_messages']} messages in {self.settings['user_window']:g}s"
+        if repeats >= self.settings['duplicate_max']:
+            return 'user', f"repeated the same message {repeats} times"
+        if channel_rate > self.settings['channel_max_messages']:
+            return 'channel', f"channel exceeded {self.settings['channel_max_messages']} messages in {self.settings['channel_window']:g}s"
+        return None
+
+
+def run_benchmark(messages: int = 200000, users: int = 50000, channels: int = 50):
+    """Feeds synthetic traffic through the detector and reports throughput."""
+    import random
+
+    settings = {
+        'user_max_messages': 5, 'user_window': 5.0,
+        'channel_max_messages': 2500, 'channel_window': 5.0,
+        'duplicate_max': 3, 'duplicate_window': 30.0,
+        'max_tracked_keys': 100000,
+    }
+    fake_now = [0.0]
+    detector = SpamDetector(settings, clock=lambda: fake_now[0])
+
+    rng = random.Random(0)
+    samples = [f"message number {i}" for i in range(100)]
+    traffic = [(rng.randrange(channels), rng.randrange(users), rng.choice(samples)) for _ in range(messages)]
+
+    flagged = 0
+    start = time.perf_counter()
+    for i, (channel_id, user_id, content) in enumerate(traffic):
+        fake_now[0] = i / 20000  # simulate 20k messages per second of wall time
+        if detector.check(1, channel_id, user_id, content):
+            flagged += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"Processed {messages} messages in {elapsed:.3f}s "
+          f"({messages / elapsed:,.0f} msg/s), flagged {flagged}, "
+          f"tracking {len(detector.user_counter)} users / {len(detector.channel_counter)} channels")
+
+
+if __name__ == "__main__":
+    run_benchmark()
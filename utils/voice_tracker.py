@@ -0,0 +1,84 @@
+"""
+voice_tracker.py
+Voice Session Tracking Module
+Keeps an in-memory table of active voice sessions and accumulates voice time
+and XP-eligible time so a single periodic ticker can credit everyone at once.
+"""
+
+import time
+
+
+class VoiceSessionTable:
+    """
+    Active voice sessions keyed by (guild_id, member_id).
+
+    Each session remembers when it was last credited. Time is moved into a
+    pending credit table either by `tick()` or when a session ends, and
+    `pop_credits()` hands the whole batch to the caller for one storage write.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        # (guild_id, member_id) -> last credited timestamp
+        self.sessions = {}
+        # (guild_id, member_id) -> [total_seconds, eligible_seconds]
+        self.credits = {}
+
+    def _credit(self, key, seconds: float, eligible: bool):
+        if seconds <= 0:
+            return
+        entry = self.credits.setdefault(key, [0.0, 0.0])
+        entry[0] += seconds
+        if eligible:
+            entry[1] += seconds
+
+    def start(self, guild_id: int, member_id: int):
+        """Opens a session, or keeps the existing one if it is already open."""
+        self.sessions.setdefault((guild_id, member_id), self.clock())
+
+    def end(self, guild_id: int, member_id: int, eligible: bool):
+        """Closes a session and banks the time since its last credit."""
+        key = (guild_id, member_id)
+        started = self.sessions.pop(key, None)
+        if started is not None:
+            self._credit(key, self.clock() - started, eligible)
+
+    def tick(self, is_eligible):
+        """
+        Banks the time since the last credit for every open session.
+
+        Args:
+            is_eligible (callable): Called as is_eligible(guild_id, member_id) and
+                returns True/False for XP eligibility, or None if the member is no
+                longer in voice (the session is then dropped without credit).
+        """
+        now = self.clock()
+        for key, last in list(self.sessions.items()):
+            eligible = is_eligible(*key)
+            if eligible is None:
+                del self.sessions[key]
+                continue
+            self._credit(key, now - last, eligible)
+            self.sessions[key] = now
+
+    def reconcile(self, active_keys):
+        """
+        Makes the session table match the members actually in voice, e.g. after
+        a reconnect. Sessions for members who left while we were disconnected
+        are dropped without credit; newly seen members start a fresh session.
+        """
+        active_keys = set(active_keys)
+        for key in list(self.sessions):
+            if key not in active_keys:
+                del self.sessions[key]
+        now = self.clock()
+        for key in active_keys:
+            self.sessions.setdefault(key, now)
+
+    def pop_credits(self):
+        """Returns and clears all pending credits."""
+        credits, self.credits = self.credits, {}
+        return credits
+
+    def __len__(self):
+        return len(self.sessions)